@@ -1,25 +1,88 @@
-import json
 import logging
 import time
-from threading import Thread
-from flask import Flask, jsonify
+from threading import Thread, Lock
+
+import orjson
+from flask import Flask, Response, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 
 from config import Config
 from slack_handler import SlackHandler
 
 logger = logging.getLogger(__name__)
 
+
+def _orjson_default(obj):
+    """Fallback for types orjson can't encode natively (sets, objects with to_dict)"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that encodes responses with orjson instead of the stdlib json module"""
+    sort_keys = True
+    compact = None
+
+    def _options(self) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_orjson_default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default, option=self._options())
+        return self._app.response_class(body, mimetype='application/json')
+
+
 # Global variables
 app = Flask(__name__)
+app.json_provider_class = OrjsonProvider
+app.json = OrjsonProvider(app)
 slack_handler = None
 slack_connection_failed = False
 
+# Short-lived cache for slack_handler.get_stats() so bursts of probes share one computation
+STATS_CACHE_TTL_SECONDS = 1.0
+_stats_cache = {'ts': 0.0, 'value': None}
+_stats_cache_lock = Lock()
+
+# Static portions of /status and /health responses, built once at import
+_STATUS_BASE = {
+    'app': 'Flask + Slack Bot',
+    'version': '1.0.0',
+    'flask_server': 'running',
+    'ml_integration': 'enabled',
+    'batch_timeout': f"{Config.BATCH_TIMEOUT_SECONDS}s",
+    'max_batch_size': Config.MAX_BATCH_SIZE
+}
+_HEALTH_COMPONENTS_BASE = {
+    'flask': 'healthy',
+    'ml_integration': 'enabled'
+}
+
 
 def create_app():
     global slack_handler, slack_connection_failed
     
     app.config['DEBUG'] = Config.DEBUG
-    
+
+    # Never pretty-print or sort response keys, even in debug mode
+    # (provider-level equivalent of JSONIFY_PRETTYPRINT_REGULAR / JSON_SORT_KEYS)
+    app.json.compact = True
+    app.json.sort_keys = False
+
     try:
         # Just create the SlackHandler, don't start it yet
         slack_handler = SlackHandler(Config.get_slack_config())
@@ -28,20 +91,37 @@ def create_app():
         slack_connection_failed = True
         logger.error(f"Slack handler creation failed: {e}")
     
+    try:
+        # Socket Mode connection for the edit-workflow buttons (idempotent)
+        from edit_rag.edit_formatter import ensure_socket_mode
+        ensure_socket_mode()
+    except Exception as e:
+        logger.error(f"Edit workflow Socket Mode start failed: {e}")
+    
+    if Config.WARMUP_LLM:
+        from edit_rag_processor import start_llm_warmup
+        start_llm_warmup()
+    
     return app
 
 
+def _cached_stats(ttl: float = STATS_CACHE_TTL_SECONDS):
+    """Return slack_handler.get_stats(), recomputed at most once per ttl seconds"""
+    with _stats_cache_lock:
+        now = time.monotonic()
+        if _stats_cache['value'] is None or now - _stats_cache['ts'] > ttl:
+            _stats_cache['value'] = slack_handler.get_stats()
+            _stats_cache['ts'] = now
+        return _stats_cache['value']
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     try:
         health_status = {
             'status': 'healthy',
             'timestamp': time.time(),
-            'components': {
-                'flask': 'healthy',
-                'slack_handler': 'unknown',
-                'ml_integration': 'enabled'
-            }
+            'components': {**_HEALTH_COMPONENTS_BASE, 'slack_handler': 'unknown'}
         }
         
         if slack_connection_failed:
@@ -49,7 +129,7 @@ def health_check():
             health_status['status'] = 'degraded'
         elif slack_handler:
             try:
-                stats = slack_handler.get_stats()
+                stats = _cached_stats()
                 health_status['components']['slack_handler'] = 'healthy'
                 health_status['slack_stats'] = stats
             except Exception as e:
@@ -78,7 +158,7 @@ def get_stats():
         if not slack_handler:
             return jsonify({'error': 'Slack handler not initialized'}), 503
         
-        stats = slack_handler.get_stats()
+        stats = _cached_stats()
         return jsonify(stats), 200
         
     except Exception as e:
@@ -112,12 +192,12 @@ def get_final_outcomes(channel_id, thread_ts=None):
         if slack_connection_failed or not slack_handler:
             return jsonify({'error': 'Slack handler not available'}), 503
         
-        outcomes_json = slack_handler.get_final_outcomes_json(channel_id, thread_ts)
+        outcomes = slack_handler.get_final_outcomes(channel_id, thread_ts)
         
         return jsonify({
             'channel_id': channel_id,
             'thread_ts': thread_ts,
-            'outcomes': json.loads(outcomes_json)
+            'outcomes': outcomes
         }), 200
         
     except Exception as e:
@@ -129,14 +209,9 @@ def get_final_outcomes(channel_id, thread_ts=None):
 def app_status():
     try:
         status = {
-            'app': 'Flask + Slack Bot',
-            'version': '1.0.0',
+            **_STATUS_BASE,
             'timestamp': time.time(),
-            'flask_server': 'running',
-            'slack_integration': 'disconnected' if slack_connection_failed else ('connected' if slack_handler else 'not_initialized'),
-            'ml_integration': 'enabled',
-            'batch_timeout': f"{Config.BATCH_TIMEOUT_SECONDS}s",
-            'max_batch_size': Config.MAX_BATCH_SIZE
+            'slack_integration': 'disconnected' if slack_connection_failed else ('connected' if slack_handler else 'not_initialized')
         }
         
         return jsonify(status), 200
@@ -159,23 +234,29 @@ def debug_state():
             'timestamp': time.time()
         }
         
-        # Get detailed message store contents
-        all_messages = {}
-        for channel_id, threads in slack_handler.message_store._messages.items():
-            all_messages[channel_id] = {}
-            for thread_key, messages in threads.items():
-                all_messages[channel_id][thread_key] = [
-                    {
-                        'user_id': msg.user_id,
-                        'username': msg.username,
-                        'text': msg.text,
-                        'timestamp': msg.timestamp
-                    } for msg in messages
-                ]
-        
-        debug_info['current_messages'] = all_messages
-        
-        return jsonify(debug_info), 200
+        # Snapshot message list references under the store lock; the contents
+        # are serialized lazily while the response is streamed
+        message_store = slack_handler.message_store
+        with message_store._lock:
+            snapshot = [
+                (channel_id, [(thread_key, list(messages)) for thread_key, messages in threads.items()])
+                for channel_id, threads in message_store._messages.items()
+            ]
+        
+        def generate():
+            # Emit the header fields, then stream current_messages one thread at a time
+            header = orjson.dumps(debug_info, default=_orjson_default)
+            yield header[:-1] + b',"current_messages":{'
+            for i, (channel_id, threads) in enumerate(snapshot):
+                yield (b',' if i else b'') + orjson.dumps(channel_id) + b':{'
+                for j, (thread_key, messages) in enumerate(threads):
+                    yield (b',' if j else b'') + orjson.dumps(thread_key) + b':'
+                    # orjson encodes SlackMessage dataclasses natively, no per-message dicts
+                    yield orjson.dumps(messages)
+                yield b'}'
+            yield b'}}'
+        
+        return Response(stream_with_context(generate()), status=200, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Debug endpoint failed: {e}")
@@ -0,0 +1,14 @@
+"""
+ASGI entry point for the Flask app.
+
+Wraps the WSGI app with asgiref so it can be served by uvicorn instead of
+Flask's development server:
+
+    uvicorn asgi:asgi_app --host 0.0.0.0 --port 3001
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app
+
+asgi_app = WsgiToAsgi(app)
@@ -1,5 +1,7 @@
 import os
-from typing import Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -21,6 +23,9 @@ class Config:
     ML_MODEL_TIMEOUT: int = int(os.getenv('ML_MODEL_TIMEOUT', '10'))
     ML_MODEL_RETRIES: int = int(os.getenv('ML_MODEL_RETRIES', '3'))
     
+    # Send a 1-token request at startup to open the edit LLM connection early (billed)
+    WARMUP_LLM: bool = os.getenv('WARMUP_LLM', 'False').lower() == 'true'
+    
     # Message Batching Configuration
     BATCH_TIMEOUT_SECONDS: int = int(os.getenv('BATCH_TIMEOUT_SECONDS', '20'))
     MAX_BATCH_SIZE: int = int(os.getenv('MAX_BATCH_SIZE', '50'))
@@ -36,19 +41,31 @@ class Config:
         if missing:
             raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
+    # The class attributes above are read from the environment at import, and these
+    # mappings are built from them on first call and cached. They are returned as
+    # read-only views (MappingProxyType, not dict): callers may index them but not
+    # mutate them. Call clear_cache() after changing the attributes to rebuild them.
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls.get_slack_config.cache_clear()
+        cls.get_ml_config.cache_clear()
+
     @classmethod
-    def get_slack_config(cls) -> Dict[str, str]:
-        return {
+    @lru_cache(maxsize=1)
+    def get_slack_config(cls) -> Mapping[str, str]:
+        return MappingProxyType({
             'bot_token': cls.SLACK_BOT_TOKEN,
             'app_token': cls.SLACK_APP_TOKEN,
             'signing_secret': cls.SLACK_SIGNING_SECRET,
             'batch_timeout': str(cls.BATCH_TIMEOUT_SECONDS)
-        }
+        })
 
     @classmethod
-    def get_ml_config(cls) -> Dict[str, str]:
-        return {
+    @lru_cache(maxsize=1)
+    def get_ml_config(cls) -> Mapping[str, str]:
+        return MappingProxyType({
             'endpoint': cls.ML_MODEL_ENDPOINT,
             'timeout': cls.ML_MODEL_TIMEOUT,
             'retries': cls.ML_MODEL_RETRIES
-        } 
\ No newline at end of file
+        }) 
\ No newline at end of file
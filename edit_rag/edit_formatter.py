@@ -1,5 +1,9 @@
 import os
 import json
+import logging
+import tempfile
+import time
+import orjson
 from dotenv import load_dotenv
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 from langchain.prompts import ChatPromptTemplate
@@ -7,11 +11,12 @@ from rag_it1.retrieval.vectorstore import get_vectorstore
 from edit_rag.slack_button import send_job_desc
 import requests
 from slack_bolt.adapter.socket_mode import SocketModeHandler
-from threading import Thread
-from edit_rag.slack_button import app as slack_app, SLACK_APP_TOKEN 
-
-Thread(target=lambda: SocketModeHandler(slack_app, SLACK_APP_TOKEN).start(), daemon=True).start()
-env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.env'))
+from threading import Thread, Lock
+from contextvars import ContextVar
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from edit_rag.slack_button import app as slack_app, SLACK_APP_TOKEN, env_path
+from edit_state_manager import get_user_edit_status, update_user_edit_state
 from maya_agent.database import insert_draft
 # Import normalization logic
 try:
@@ -23,23 +28,57 @@ except ImportError:
 
 # Step 2: load the .env file
 load_dotenv(dotenv_path=env_path)
-CHANNEL_ID= None
+logger = logging.getLogger(__name__)
+# Per-request channel id; each thread/task sees its own value without locking
+_CHANNEL_ID: ContextVar[Optional[str]] = ContextVar('CHANNEL_ID', default=None)
+_EXEC = ThreadPoolExecutor(max_workers=4)  # Background vectorstore cleanup off the approval path
 LINKEDIN_ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")
 PERSON_URN = os.getenv("PERSON_URN")
 SLACK_BOT = os.getenv("SLACK_BOT_TOKEN")
 
-def send_slack_message(text):#Add Channel_id as a paramater
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT}",
-        "Content-Type": "application/json; charset=utf-8"
+# Shared LLM client, built once instead of on every edit
+_LLM = ChatNVIDIA(
+    model="meta/llama3-70b-instruct",
+    api_key=os.getenv("NVIDIA_API_KEY")
+)
+
+# Pooled HTTP sessions so repeated Slack/LinkedIn calls reuse TCP+TLS connections
+_slack_session = requests.Session()
+_slack_session.headers.update({
+    "Authorization": f"Bearer {SLACK_BOT}",
+    "Content-Type": "application/json; charset=utf-8"
+})
+_linkedin_session = requests.Session()
+_linkedin_session.headers.update({
+    "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
+    "Content-Type": "application/json",
+    "X-Restli-Protocol-Version": "2.0.0"
+})
+
+# Static LinkedIn UGC post body, pre-encoded once; only the commentary text changes per post
+_LINKEDIN_PAYLOAD_SKEL = {
+    "author": PERSON_URN,
+    "lifecycleState": "PUBLISHED",
+    "specificContent": {
+        "com.linkedin.ugc.ShareContent": {
+            "shareCommentary": {"text": None},
+            "shareMediaCategory": "NONE"
+        }
+    },
+    "visibility": {
+        "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
     }
-    
+}
+_LINKEDIN_PAYLOAD_PREFIX, _LINKEDIN_PAYLOAD_SUFFIX = orjson.dumps(_LINKEDIN_PAYLOAD_SKEL).split(b'"text":null', 1)
+
+def send_slack_message(text, channel_id=None):
+    channel_id = channel_id or _CHANNEL_ID.get()
     data = {
-        "channel": CHANNEL_ID,
+        "channel": channel_id,
         "text": text,
     }
-    print(CHANNEL_ID)
-    response = requests.post("https://slack.com/api/chat.postMessage", json=data, headers=headers)#Add username and user_id
+    logger.debug("Posting Slack message to channel %s", channel_id)
+    response = _slack_session.post("https://slack.com/api/chat.postMessage", json=data)#Add username and user_id
  
     return response.json()
 
@@ -47,6 +86,33 @@ def send_slack_message(text):#Add Channel_id as a paramater
 
 
 
+_socket_mode_started = False
+_socket_mode_lock = Lock()
+
+
+def ensure_socket_mode():
+    """Start the Socket Mode connection for the edit buttons app once per process"""
+    global _socket_mode_started
+    with _socket_mode_lock:
+        if _socket_mode_started:
+            return
+        Thread(target=lambda: SocketModeHandler(slack_app, SLACK_APP_TOKEN).start(), daemon=True).start()
+        _socket_mode_started = True
+
+
+def write_json_atomic(file_path, data):
+    """Write JSON to a temp file and rename it over file_path so readers never see a torn write"""
+    # Unique temp name in the target's directory, so concurrent writers don't share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
 def delete_user_data(user_id: str):
     """
     Delete all documents from the vectorstore associated with a given user_id.
@@ -58,22 +124,94 @@ def delete_user_data(user_id: str):
         # Perform deletion based on metadata filter
         deleted = collection.delete(where={"user_id": user_id})
 
-        print(f"✅ Successfully deleted data for user_id: {user_id}")
+        logger.info("Deleted vectorstore data for user_id: %s", user_id)
         return {"status": "success", "user_id": user_id, "deleted": deleted}
     except Exception as e:
-        print(f"❌ Failed to delete data for user_id: {user_id} - {str(e)}")
+        logger.error("Failed to delete data for user_id: %s - %s", user_id, e)
         return {"status": "error", "user_id": user_id, "error": str(e)}
 
-def load_job_store(file_path="job_store.json"):
-    if not os.path.exists(file_path):
-        return {}
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_job_store(data, file_path="job_store.json"):
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+JOB_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_store.json")
+JOB_STORE_SNAPSHOT_INTERVAL_SECONDS = 60
+
+# In-memory job store is the source of truth; each update is appended to the WAL
+# (the snapshot path + ".wal") and a background thread periodically folds the WAL
+# into a fresh snapshot
+_job_store = None
+_job_store_path = JOB_STORE_PATH  # Snapshot the in-memory store is persisted to
+_job_store_wal = None
+_job_store_wal_dirty = False  # WAL has entries not yet folded into the snapshot
+_job_store_lock = Lock()
+_snapshot_thread = None
+
+
+def load_job_store(file_path=JOB_STORE_PATH):
+    """Return the in-memory job store, loading the snapshot and replaying the WAL on first use"""
+    global _job_store, _job_store_path
+    with _job_store_lock:
+        if _job_store is None:
+            store = {}
+            if os.path.exists(file_path):
+                with open(file_path, "r", encoding="utf-8") as f:
+                    store = json.load(f)
+            wal_path = file_path + ".wal"
+            if os.path.exists(wal_path):
+                with open(wal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            break  # Torn final line from a crash mid-append
+                        store[entry["u"]] = entry["d"]
+            _job_store = store
+            _job_store_path = file_path
+        return _job_store
+
+
+def _write_snapshot_locked(data, file_path):
+    # Caller holds _job_store_lock, so no WAL append can slip in between snapshot and truncate
+    global _job_store_wal, _job_store_wal_dirty, _job_store_path
+    write_json_atomic(file_path, data)
+    if _job_store_wal is not None:
+        _job_store_wal.close()
+    _job_store_wal = open(file_path + ".wal", "w", encoding="utf-8", buffering=1)
+    _job_store_path = file_path
+    _job_store_wal_dirty = False
+
+
+def save_job_store(data, file_path=JOB_STORE_PATH):
+    """Write a full snapshot of the job store and truncate the WAL it supersedes"""
+    with _job_store_lock:
+        _write_snapshot_locked(data, file_path)
+
+
+def _append_job_store_wal(user_id, job_desc):
+    global _job_store_wal, _job_store_wal_dirty
+    with _job_store_lock:
+        if _job_store_wal is None:
+            _job_store_wal = open(_job_store_path + ".wal", "a", encoding="utf-8", buffering=1)
+        _job_store_wal.write(json.dumps({"u": user_id, "d": job_desc}, ensure_ascii=False) + "\n")
+        _job_store_wal_dirty = True
+
+
+def _snapshot_loop():
+    while True:
+        time.sleep(JOB_STORE_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            store = load_job_store()
+            with _job_store_lock:
+                # Nothing appended since the last snapshot, so it is already current
+                if _job_store_wal_dirty:
+                    _write_snapshot_locked(store, _job_store_path)
+        except Exception as e:
+            logger.error("Job store snapshot failed: %s", e)
+
+
+def _ensure_snapshot_thread():
+    global _snapshot_thread
+    with _job_store_lock:
+        if _snapshot_thread is None:
+            _snapshot_thread = Thread(target=_snapshot_loop, daemon=True)
+            _snapshot_thread.start()
 
 
 def store_job_description(job_json_path="job_descp.json"):
@@ -90,18 +228,15 @@ def store_job_description(job_json_path="job_descp.json"):
         return {"error": "Missing user_id or job_desc"}
 
     job_store = load_job_store()
-    job_store[user_id] = job_desc
-    save_job_store(job_store)
+    with _job_store_lock:
+        job_store[user_id] = job_desc
+    _append_job_store_wal(user_id, job_desc)
+    _ensure_snapshot_thread()
     return {"status": "stored", "user_id": user_id}
 
 
-def alter_job_description(reply, job_desc, original_job_data=None):
-    # Extract what user wants to change
-    llm = ChatNVIDIA(
-        model="meta/llama3-70b-instruct",
-        api_key=os.getenv("NVIDIA_API_KEY")
-    )
-    change_extractor_prompt = ChatPromptTemplate.from_template("""
+# Prompt templates are parsed once at import
+CHANGE_EXTRACTOR_PROMPT = ChatPromptTemplate.from_template("""
     Analyze the user's edit request and extract specific changes:
     
     User's Edit Request: {reply}
@@ -116,18 +251,8 @@ def alter_job_description(reply, job_desc, original_job_data=None):
     Return JSON:
     {{"skills_change": "...", "experience_change": "...", "title_change": "...", "location_change": "...", "job_type_change": "..."}}
     """)
-    # Get extracted changes
-    changes = llm.invoke(change_extractor_prompt.format(reply=reply)).content
-    changes_dict = json.loads(changes)
-    # Apply job title normalization if skills or experience changed
-    normalization_explanation = ""
-    if changes_dict.get("skills_change") or changes_dict.get("experience_change"):
-        normalized_title = normalize_job_title(changes_dict, original_job_data)
-        if normalized_title:
-            changes_dict["title_change"] = normalized_title
-            normalization_explanation = f"\n\n_Note: The job title was normalized to '{normalized_title}' based on the new skills/experience provided._"
-    # Update job description with normalized changes
-    update_prompt = ChatPromptTemplate.from_template("""
+
+UPDATE_PROMPT = ChatPromptTemplate.from_template("""
     Apply these specific changes to the job description:
     Changes: {changes}
     Original: {job_desc}
@@ -139,7 +264,26 @@ def alter_job_description(reply, job_desc, original_job_data=None):
     
     Updated Job Description:
     """)
-    updated_desc = llm.invoke(update_prompt.format(changes=json.dumps(changes_dict), job_desc=job_desc)).content
+
+
+def alter_job_description(reply, job_desc, original_job_data=None):
+    # Extract what user wants to change
+    llm = _LLM
+    # Get extracted changes
+    changes = llm.invoke(CHANGE_EXTRACTOR_PROMPT.format(reply=reply)).content
+    changes_dict = orjson.loads(changes)
+    # Nothing to change - skip the rewrite call and keep the original description
+    if not any(value and str(value).strip().lower() != "null" for value in changes_dict.values()):
+        return {"new_job_description": job_desc}
+    # Apply job title normalization if skills or experience changed
+    normalization_explanation = ""
+    if changes_dict.get("skills_change") or changes_dict.get("experience_change"):
+        normalized_title = normalize_job_title(changes_dict, original_job_data)
+        if normalized_title:
+            changes_dict["title_change"] = normalized_title
+            normalization_explanation = f"\n\n_Note: The job title was normalized to '{normalized_title}' based on the new skills/experience provided._"
+    # Update job description with normalized changes
+    updated_desc = llm.invoke(UPDATE_PROMPT.format(changes=json.dumps(changes_dict), job_desc=job_desc)).content
     if normalization_explanation:
         updated_desc += normalization_explanation
     return {"new_job_description": updated_desc}
@@ -149,7 +293,7 @@ def alter_job_description(reply, job_desc, original_job_data=None):
 # MAIN EXECUTION
 # ========================
 def post_job_to_linkedin(user_id,user_name,result):
-    print("🚀 [post_job_to_linkedin]")
+    logger.debug("post_job_to_linkedin for user %s", user_id)
 
 
     post_text = (
@@ -162,133 +306,90 @@ def post_job_to_linkedin(user_id,user_name,result):
         "#Hiring #JobOpening #Careers"
     )
 
-    headers = {
-        "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-        "X-Restli-Protocol-Version": "2.0.0"
-    }
-
-    payload = {
-        "author": PERSON_URN,
-        "lifecycleState": "PUBLISHED",
-        "specificContent": {
-            "com.linkedin.ugc.ShareContent": {
-                "shareCommentary": {"text": post_text},
-                "shareMediaCategory": "NONE"
-            }
-        },
-        "visibility": {
-            "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
-        }
-    }
+    payload = _LINKEDIN_PAYLOAD_PREFIX + b'"text":' + orjson.dumps(post_text) + _LINKEDIN_PAYLOAD_SUFFIX
 
     try:
-        res = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=payload)
+        res = _linkedin_session.post("https://api.linkedin.com/v2/ugcPosts", data=payload)
 
         if res.status_code == 201:
             post_id = res.headers.get("x-restli-id", "unknown")
             post_url = f"@{user_name} -> https://www.linkedin.com/feed/update/{post_id}"
            
-            print("jobposting url:")
-            print(post_url)
-            print("####")
+            logger.info("Job posting url: %s", post_url)
             # ✅ Send to Slack
             slack_message = f"✅ Job posted successfully! <@{user_id}>, here’s your LinkedIn link:\nhttps://www.linkedin.com/feed/update/{post_id}"
 
             send_slack_message(slack_message)
 
         else:
-            print( f"❌ Failed: {res.status_code} - {res.text}")
+            logger.error("LinkedIn post failed: %s - %s", res.status_code, res.text)
 
     except Exception as e:
-        print( f"❌ Exception: {e}")
+        logger.error("LinkedIn post exception: %s", e)
 
   
 def run_job_rewrite_pipeline(user_id, reply,job_desc,user_name,channel_id):
     
 
+    _CHANNEL_ID.set(channel_id)
     result = alter_job_description(reply,job_desc)
-    CHANNEL_ID=channel_id
     result=result["new_job_description"]
-    print("\n Altered job description processed")
+    logger.debug("Altered job description processed")
     import uuid
-    job_id = str(uuid.uuid4())[:8] 
+    job_id = uuid.uuid4().hex[:8] 
    
-    # Fix file path to access edit_mode.json from root directory
-    edit_mode_path = os.path.join(os.path.dirname(__file__), '..', 'edit_mode.json')
-    
-    try:
-        with open(edit_mode_path, 'r') as f:
-            content = f.read().strip()
-            if not content:
-                edit_mode = {}
-            else:
-                edit_mode = json.loads(content)
-
-    except FileNotFoundError:
-        edit_mode = {}
-    except json.JSONDecodeError as e:
-        print(f"Warning: Invalid JSON in edit_mode.json: {e}")
-        edit_mode = {}
-    
-
-
-    job=edit_mode[user_id]["job_data"]
+    # edit_state_manager serializes edit_mode.json updates with every other writer
+    job = (get_user_edit_status(user_id) or {})["job_data"]
 
 
 
     # use this channelid if there is an error in edge case
 
-    # CHANNEL_ID= edit_mode[user_id]["channel_id"]
+    # CHANNEL_ID= get_user_edit_status(user_id)["channel_id"]
 
 
 
     # Reset user's edit mode
-    if user_id in edit_mode:
-        edit_mode[user_id]["status"] = False
-        edit_mode[user_id]["message"] = "null"
-        edit_mode[user_id]["job_id"]="null"
-        edit_mode[user_id]["channel_id"]="null"
-        edit_mode[user_id]["user_name"]="null"
-        edit_mode[user_id]["job_data"]="null"
-    
-    # Write back to file
-    with open(edit_mode_path, 'w') as f:
-        json.dump(edit_mode, f, indent=2)
+    update_user_edit_state(user_id, {
+        "status": False,
+        "message": "null",
+        "job_id": "null",
+        "channel_id": "null",
+        "user_name": "null",
+        "job_data": "null",
+    }, create=False)
     action = send_job_desc(channel_id, result, job_id, user_name, user_id)
-    print(action)
-    print(f"📤 Sending updated job description to Slack | job_id: {job_id}")
+    logger.info("Job %s resolved with action: %s", job_id, action)
     
     if action == "approve":
-        print("✅ Approved by user. Proceeding...")
+        logger.info("Approved by user. Proceeding...")
         if user_id:
-            delete_user_data(user_id)
+            _EXEC.submit(delete_user_data, user_id)
         post_job_to_linkedin(user_id,user_name,result)
         
     elif action == "reject":
-        print("🧹 User rejected. Resetting memory and halting job.")
+        logger.info("User rejected. Resetting memory and halting job.")
         if user_id:
-            delete_user_data(user_id)
-        print(f"User selected: {action}")
+            _EXEC.submit(delete_user_data, user_id)
+        logger.debug("User selected: %s", action)
 
     elif action =="edit":
-        print("User clicked edit, initiating edit workflow")
+        logger.info("User clicked edit, initiating edit workflow")
      
-        print( "EDIT Started")
 
 
     elif action =="draft":
-        print("User selected draft, sent to draft function")
+        logger.info("User selected draft, sent to draft function")
         insert_draft(
             job_id=job_id,  # ← you already generated it before calling send_job_desc
             user_id=user_id,
             username=user_name,
-            channel_id=CHANNEL_ID,
+            channel_id=channel_id,
             job_data=job,
             description=result
         )
         if user_id:
-            delete_user_data(user_id)
+            _EXEC.submit(delete_user_data, user_id)
         
         # # Send confirmation message to Slack
         # draft_confirmation = f"✅ <@{user_id}>, your job posting has been saved as a draft!\n\n" \
@@ -305,7 +406,7 @@ def run_job_rewrite_pipeline(user_id, reply,job_desc,user_name,channel_id):
         # # Set error to stop workflow from proceeding to LinkedIn posting
         # state["error"] = f"User selected: {action}"
         # state["job_result"] = f"Draft saved successfully: {job_id}"
-        print("Edit clicked")
+        logger.debug("Edit clicked")
 
 
 # # Run only if script is executed directly
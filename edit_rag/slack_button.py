@@ -2,13 +2,17 @@
 
 import os
 import time
+import logging
+import asyncio
 import uuid
 import sys
 from threading import Thread
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
-from threading import Event
 import json
+import re
+from threading import Lock
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 # Step 1: go up one directory level from this script's location
@@ -16,6 +20,7 @@ env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.env')
 
 # Step 2: load the .env file
 load_dotenv(dotenv_path=env_path)
+logger = logging.getLogger(__name__)
 # ====== Slack Tokens ======
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
@@ -26,9 +31,12 @@ app = App(token=SLACK_BOT_TOKEN)
  # job_id → "approve"/"reject"/"edit"
 
 
-response_events = {}   # job_id → Event object
-response_values = {}   # job_id → "approve" / "reject" / "edit"
-job_storage = {}       # job_id → job_description storage
+# job_id → {"future": (event loop, asyncio.Future), "value": "approve"/"reject"/"edit"/..., "desc": job description}
+# Entries are popped once the response is consumed; the TTL evicts jobs nobody ever answered
+JOB_CACHE_MAXSIZE = 10000
+JOB_CACHE_TTL_SECONDS = 3600
+_jobs = TTLCache(maxsize=JOB_CACHE_MAXSIZE, ttl=JOB_CACHE_TTL_SECONDS)
+_jobs_lock = Lock()  # TTLCache is not thread-safe
 
 # ====== Button Click Handler ======
 def update_edit_mode(user_id, message):
@@ -40,14 +48,25 @@ def update_edit_mode(user_id, message):
     
     success = set_user_edit_mode(user_id, message)
     if success:
-        print(f"✅ Updated edit_mode.json for user {user_id}")
+        logger.info("Updated edit_mode.json for user %s", user_id)
     else:
-        print(f"❌ Failed to update edit_mode.json for user {user_id}")
-
-@app.action("approve")
-@app.action("reject")
-@app.action("edit")
-@app.action("draft_opt")
+        logger.error("Failed to update edit_mode.json for user %s", user_id)
+
+def _on_edit_click(user_id, job):
+    # Get the original job description from job storage and update edit_mode.json
+    original_message = job["desc"] if job else ""
+    update_edit_mode(user_id, original_message)
+
+# action_id → (result text template, response value, optional side effect)
+BUTTON_ACTIONS = {
+    "approve": ("✅ Thanks for the confirmation, <@{user_id}>. I'm now posting the job on LinkedIn.", "approve", None),
+    "reject": ("❌ No worries <@{user_id}>, I’ve canceled the posting.", "reject", None),
+    "edit": ("✏ Got it <@{user_id}>, I've marked this for editing. Please provide the necessary changes.", "edit", _on_edit_click),
+    "draft_opt": ("📋 Got it <@{user_id}>, I'm saving this as a draft. You'll get a confirmation shortly.", "draft", None),
+}
+UNKNOWN_ACTION = ("❓ Unknown action clicked.", "unknown", None)
+
+@app.action(re.compile("^(?:" + "|".join(map(re.escape, BUTTON_ACTIONS)) + ")$"))
 def handle_button_click(ack, body, client, action):
     ack()
 
@@ -59,7 +78,7 @@ def handle_button_click(ack, body, client, action):
         user_id= block_metadata.get("user_id","123")
         is_edit_workflow = block_metadata.get("is_edit_workflow", False)  # New flag for edit workflow
     except Exception as e:
-        print("⚠ Failed to parse block_id metadata:", e)
+        logger.warning("Failed to parse block_id metadata: %s", e)
         job_id = "unknown"
         user_name = "user"
         is_edit_workflow = False
@@ -68,36 +87,21 @@ def handle_button_click(ack, body, client, action):
     message_ts = body["message"]["ts"]
     channel_id = body["channel"]["id"]
 
-    print(f"🖱 Button clicked: {clicked_action} for job_id: {job_id} by @{user_name}")
-
-    if clicked_action == "approve":
-        result_text = f"✅ Thanks for the confirmation, <@{user_id}>. I'm now posting the job on LinkedIn."
-        response_values[job_id] = "approve"
-        print("send-----------------------------------------------------------------------")
+    logger.info("Button clicked: %s for job_id: %s by @%s", clicked_action, job_id, user_name)
 
-    elif clicked_action == "reject":
-        result_text = f"❌ No worries <@{user_id}>, I’ve canceled the posting."
-        response_values[job_id] = "reject"
+    with _jobs_lock:
+        job = _jobs.get(job_id)
 
-    elif clicked_action == "edit":
-        # Get the original job description from job storage
-        original_message = job_storage.get(job_id, "")
-        # Update edit_mode.json
-        update_edit_mode(user_id, original_message)
-        result_text = f"✏ Got it <@{user_id}>, I've marked this for editing. Please provide the necessary changes."
-        response_values[job_id] = "edit"
-
-    elif clicked_action == "draft_opt":
-        result_text = f"📋 Got it <@{user_id}>, I'm saving this as a draft. You'll get a confirmation shortly."
-        response_values[job_id] = "draft"
-    else:
-        result_text = f"❓ Unknown action clicked."
-        response_values[job_id] = "unknown"
+    template, value, side_effect = BUTTON_ACTIONS.get(clicked_action, UNKNOWN_ACTION)
+    if side_effect:
+        side_effect(user_id, job)
+    result_text = template.format(user_id=user_id)
 
-    # Unblock the waiting thread
-    print(job_id,"_--------------------------------------------------------------------------------------")
-    if job_id in response_events:
-        response_events[job_id].set()
+    # Resolve the future the sender is awaiting (Bolt runs this handler on its own thread)
+    if job:
+        job["value"] = value
+        loop, future = job["future"]
+        loop.call_soon_threadsafe(_resolve_future, future, value)
 
     # Update Slack message
     client.chat_update(
@@ -110,16 +114,18 @@ def handle_button_click(ack, body, client, action):
         }]
     )
 
+def _resolve_future(future, value):
+    if not future.done():
+        future.set_result(value)
+
 # ====== Send Job Description to Slack ======
-def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
+async def send_job_desc_async(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
     client = app.client
 
-    event = Event()
-    response_events[job_id] = event
-    response_values[job_id] = None
-    
-    # Store job description in global storage
-    job_storage[job_id] = JOB_DESC
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    with _jobs_lock:
+        _jobs[job_id] = {"future": (loop, future), "value": None, "desc": JOB_DESC}
 
     # 👉 Encode user info into block_id as JSON (removed job_desc to fix character limit)
     block_metadata = json.dumps({
@@ -128,8 +134,9 @@ def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
         "user_id": user_id
     })
 
-    print(f"📤 Posting to Slack | job_id: {job_id}")
-    client.chat_postMessage(
+    logger.debug("Posting to Slack | job_id: %s", job_id)
+    await asyncio.to_thread(
+        client.chat_postMessage,
         channel=CHANNEL_ID,
         text="Choose an action:",
         blocks=[
@@ -151,9 +158,31 @@ def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
         ]
     )
 
-    print(f"⏳ Waiting for user response for job_id: {job_id}")
-    event.wait()  # Block until user responds
+    logger.debug("Waiting for user response for job_id: %s", job_id)
+    try:
+        # Suspends until the button handler resolves it. Bounded by the cache TTL: once the
+        # entry is evicted a click can no longer reach this future
+        action = await asyncio.wait_for(future, JOB_CACHE_TTL_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("No response for job_id %s within %ss", job_id, JOB_CACHE_TTL_SECONDS)
+        action = "timeout"
+    finally:
+        with _jobs_lock:
+            _jobs.pop(job_id, None)
+
+    logger.info("Response for job_id %s: %s", job_id, action)
+    return action
+
 
-    action = response_values.get(job_id, None)
-    print(f"✅ Response for job_id {job_id}: {action}")
-    return action
\ No newline at end of file
+def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
+    """Blocking wrapper around send_job_desc_async for synchronous callers.
+
+    Like before the async rewrite, this holds the calling thread until a button is clicked,
+    now at most JOB_CACHE_TTL_SECONDS (then it returns "timeout"). Code already running an
+    event loop must await send_job_desc_async instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(send_job_desc_async(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id))
+    raise RuntimeError("send_job_desc() called from a running event loop; await send_job_desc_async() instead")
\ No newline at end of file
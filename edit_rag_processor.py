@@ -1,24 +1,211 @@
+"""
+Edit pipeline for job descriptions a user asked to change.
+
+Expects the process environment (NVIDIA_API_KEY etc.) to be loaded by the
+entry point before import.
+"""
+
+import asyncio
+import hashlib
 import os
 import json
 import uuid
-from typing import Dict, Any
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 import logging
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from langchain.prompts import ChatPromptTemplate
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 # Import the state manager
 from edit_state_manager import clear_user_edit_mode
 
-load_dotenv()
+# Environment variables (NVIDIA_API_KEY, ...) are loaded once by the entry point
+# via config.py; set EDIT_RAG_AUTOLOAD_DOTENV to load .env when imported standalone
+if os.getenv("EDIT_RAG_AUTOLOAD_DOTENV"):
+    load_dotenv()
 logger = logging.getLogger(__name__)
 
+EDIT_MODEL = "meta/llama3-70b-instruct"
 
-def edit_rag(user_id: str, username: str, channel_id: str, edit_instructions: str, 
-             original_message: str, slack_handler=None) -> Dict[str, Any]:
+# Start of the "Does this look okay?" footer that ends the job description in a Slack message
+_APPROVAL_PROMPT_RE = re.compile(r'^\s*Does this look okay\?', re.M)
+
+# Mechanical edit instructions that can be applied without the LLM
+_REPLACE_RE = re.compile(r'^\s*replace\s+(["\'])(.+?)\1\s+with\s+(["\'])(.*?)\3\s*\.?\s*$', re.I)
+_REMOVE_RE = re.compile(r'^\s*(?:remove|delete)\s+(?:the\s+)?(?:line\s+|requirement\s+|bullet\s+)?(["\'])(.+?)\1\s*\.?\s*$', re.I)
+_FIELD_CHANGE_RE = re.compile(
+    r'^\s*(?:change|set|update)\s+(?:the\s+)?(salary|location|job type|title)\s+to\s+(.+?)\s*\.?\s*$', re.I
+)
+# "**Location:** Remote" / "- Salary: $100k" style field lines, keyed by the instruction's field name
+_FIELD_LINE_RES = {
+    field: re.compile(r'^([ \t]*[-*•]*[ \t]*\**[ \t]*(?:' + names + r')[ \t]*:[ \t]*\**[ \t]*)(.+)$', re.I | re.M)
+    for field, names in {
+        "salary": "salary|compensation|pay",
+        "location": "location",
+        "job type": "job type|employment type",
+        "title": "job title|title",
+    }.items()
+}
+# Leading list marker ("- ", "* ", "• ", "1. ") of a job description line
+_BULLET_RE = re.compile(r'^\s*(?:[-*•]+|\d+[.)])?\s*')
+
+# Static parts of the job description editing prompt; only the job description
+# and edit instructions are spliced in per request
+_PROMPT_PREFIX = """
+You are a smart job description editor. Your task is to update the given job description based on the user's specific edit instructions.
+
+Instructions:
+- ONLY update the fields or aspects mentioned in the edit instructions
+- DO NOT add fictional or speculative information
+- MAINTAIN the original job description's formatting, professionalism, and clarity
+- If the edit instructions are unclear, make reasonable interpretations but stay conservative
+- Your output should be the complete updated job description
+- Do NOT include any introductory text or explanations
+
+Original Job Description:
+"""
+_PROMPT_MID = """
+
+Edit Instructions:
+"""
+_PROMPT_SUFFIX = """
+
+Updated Job Description:
+"""
+
+
+# Upper bound on job description tokens sent to the LLM (context minus instructions/completion)
+MAX_INPUT_TOKENS = 7000
+# Rough chars-per-token ratio used when tiktoken isn't installed
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    return tiktoken.get_encoding("cl100k_base") if tiktoken else None
+
+
+def truncate_job_description(job_description: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
+    """Trim job_description to at most max_tokens tokens (estimated if tiktoken is unavailable)"""
+    encoding = _get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        if len(job_description) <= max_chars:
+            return job_description
+        truncated = job_description[:max_chars]
+    else:
+        # Cheap upper bound first: a token is at least one character
+        if len(job_description) <= max_tokens:
+            return job_description
+        tokens = encoding.encode(job_description)
+        if len(tokens) <= max_tokens:
+            return job_description
+        truncated = encoding.decode(tokens[:max_tokens])
+    logger.warning(f"Truncated job description from {len(job_description)} to {len(truncated)} chars for the edit prompt")
+    return truncated
+
+
+def build_edit_prompt(job_description: str, edit_instructions: str) -> str:
+    """Return the edit prompt text; ChatNVIDIA accepts it as a plain human message"""
+    job_description = truncate_job_description(job_description)
+    return f"{_PROMPT_PREFIX}{job_description}{_PROMPT_MID}{edit_instructions}{_PROMPT_SUFFIX}"
+
+
+@lru_cache(maxsize=4)
+def _get_llm(model: str) -> ChatNVIDIA:
+    """Return a shared ChatNVIDIA client per model so its HTTP session is reused"""
+    return ChatNVIDIA(
+        model=model,
+        api_key=os.getenv("NVIDIA_API_KEY")
+    )
+
+
+def _warm_up_llm() -> None:
+    """Send a 1-token request so the shared client's TLS connection is open before the first edit"""
+    try:
+        _get_llm(EDIT_MODEL).bind(max_tokens=1).invoke("ping")
+        logger.debug("LLM connection warm-up complete")
+    except Exception as e:
+        logger.debug(f"LLM connection warm-up failed: {e}")
+
+
+def start_llm_warmup() -> None:
+    """
+    Warm up the edit LLM connection in a background thread.
+    
+    Called from the app startup path once the environment is loaded, never at
+    import, since the warm-up is a billed request.
+    """
+    threading.Thread(target=_warm_up_llm, name="llm-warmup", daemon=True).start()
+
+
+# Recent LLM edits, so retried/duplicate requests don't pay for another generation
+EDIT_CACHE_MAXSIZE = 512
+EDIT_CACHE_TTL_SECONDS = 3600
+_edit_cache = TTLCache(maxsize=EDIT_CACHE_MAXSIZE, ttl=EDIT_CACHE_TTL_SECONDS)
+_edit_cache_lock = threading.Lock()
+
+
+def _edit_cache_key(job_description: str, edit_instructions: str, model: str = EDIT_MODEL) -> str:
+    data = f"{model}\x00{job_description}\x00{edit_instructions}".encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+# Minimum seconds between chat.update calls while streaming (keeps under Slack's rate limit)
+STREAM_UPDATE_INTERVAL_SECONDS = 1.0
+
+
+async def stream_edit_to_slack(client, channel_id: str, username: str, job_description: str,
+                         edit_instructions: str) -> Tuple[str, str]:
+    """
+    Stream the edited job description into a Slack message as it is generated.
+    
+    Args:
+        client: Slack WebClient used to post and update the message
+        channel_id: Slack channel ID
+        username: User's display name
+        job_description: Job description to edit
+        edit_instructions: User's edit instructions
+        
+    Returns:
+        Tuple of (full updated description, ts of the streamed message)
+    """
+    placeholder = await asyncio.to_thread(
+        client.chat_postMessage,
+        channel=channel_id,
+        text=f"✏️ Updating the job description for @{username}..."
+    )
+    message_ts = placeholder["ts"]
+    
+    prompt = build_edit_prompt(job_description, edit_instructions)
+    chunks = []
+    last_update = time.monotonic()
+    async for chunk in _get_llm(EDIT_MODEL).astream(prompt):
+        chunks.append(chunk.content)
+        now = time.monotonic()
+        if now - last_update >= STREAM_UPDATE_INTERVAL_SECONDS:
+            await asyncio.to_thread(client.chat_update, channel=channel_id, ts=message_ts, text="".join(chunks))
+            last_update = now
+    
+    return "".join(chunks), message_ts
+
+
+async def edit_rag_async(user_id: str, username: str, channel_id: str, edit_instructions: str, 
+                         original_message: str, slack_handler=None) -> Dict[str, Any]:
     """
     Process edit instructions and generate updated job description.
     
+    LLM calls are awaited and blocking Slack/state calls run in worker threads,
+    so many edits can be in flight on one event loop.
+    
     Args:
         user_id: User ID
         username: User's display name
@@ -30,50 +217,55 @@ def edit_rag(user_id: str, username: str, channel_id: str, edit_instructions: st
     Returns:
         Dictionary with success status and updated job description
     """
+    # Reject unusable input before any LLM/Slack work
+    if not validate_edit_instructions(edit_instructions):
+        logger.warning(f"Invalid edit instructions from user {user_id}: {edit_instructions!r}")
+        return {
+            "status": "error",
+            "message": "Edit instructions are empty or too short"
+        }
+    
     try:
         logger.info(f"Processing edit request for user {user_id}")
         
-        # Initialize LLM
-        llm = ChatNVIDIA(
-            model="meta/llama3-70b-instruct",
-            api_key=os.getenv("NVIDIA_API_KEY")
-        )
-        
-        # Create prompt for job description editing
-        edit_prompt = ChatPromptTemplate.from_template("""
-You are a smart job description editor. Your task is to update the given job description based on the user's specific edit instructions.
-
-Instructions:
-- ONLY update the fields or aspects mentioned in the edit instructions
-- DO NOT add fictional or speculative information
-- MAINTAIN the original job description's formatting, professionalism, and clarity
-- If the edit instructions are unclear, make reasonable interpretations but stay conservative
-- Your output should be the complete updated job description
-- Do NOT include any introductory text or explanations
-
-Original Job Description:
-{original_job_description}
-
-Edit Instructions:
-{edit_instructions}
-
-Updated Job Description:
-""")
-        
         # Extract job description from the original message
         job_description = extract_job_description(original_message)
+        if not job_description:
+            logger.warning(f"No job description found in original message for user {user_id}")
+            return {
+                "status": "error",
+                "message": "No job description found to edit"
+            }
         
-        # Generate updated job description
-        updated_description = llm.invoke(
-            edit_prompt.format(
-                original_job_description=job_description,
-                edit_instructions=edit_instructions
-            )
-        ).content
+        # Generate updated job description: applied directly for mechanical edits,
+        # reused for repeated requests, streamed into Slack when we have a client
+        # to show progress with
+        message_ts = None
+        cache_key = _edit_cache_key(job_description, edit_instructions)
+        updated_description = try_deterministic_edit(job_description, edit_instructions)
+        if updated_description is not None:
+            logger.info(f"Applied edit for user {user_id} without the LLM")
+        else:
+            with _edit_cache_lock:
+                updated_description = _edit_cache.get(cache_key)
+            if updated_description is not None:
+                logger.info(f"Reusing cached edit for user {user_id}")
+            else:
+                if slack_handler is not None:
+                    updated_description, message_ts = await stream_edit_to_slack(
+                        slack_handler.client, channel_id, username, job_description, edit_instructions
+                    )
+                else:
+                    updated_description = (await _get_llm(EDIT_MODEL).ainvoke(
+                        build_edit_prompt(job_description, edit_instructions)
+                    )).content
+                with _edit_cache_lock:
+                    _edit_cache[cache_key] = updated_description
         
         # Send updated job description to Slack
-        success = send_updated_job_to_slack(
-            channel_id, updated_description, user_id, username, slack_handler
+        success = await asyncio.to_thread(
+            send_updated_job_to_slack,
+            channel_id, updated_description, user_id, username, slack_handler, message_ts
         )
         
         if success:
@@ -101,6 +293,14 @@ Updated Job Description:
         }
 
 
+def edit_rag(user_id: str, username: str, channel_id: str, edit_instructions: str, 
+             original_message: str, slack_handler=None) -> Dict[str, Any]:
+    """Blocking wrapper around edit_rag_async for synchronous callers"""
+    return asyncio.run(edit_rag_async(
+        user_id, username, channel_id, edit_instructions, original_message, slack_handler
+    ))
+
+
 def extract_job_description(original_message: str) -> str:
     """
     Extract job description from the original Slack message.
@@ -111,28 +311,73 @@ def extract_job_description(original_message: str) -> str:
     Returns:
         Clean job description text
     """
-    # Remove user mentions and extra text
-    lines = original_message.split('\n')
-    job_desc_lines = []
+    text = original_message
     
     # Skip the first line if it contains user mention
-    start_idx = 0
-    if lines and lines[0].startswith('Hey @'):
-        start_idx = 1
+    if text.startswith('Hey @'):
+        text = text.partition('\n')[2]
     
-    # Find the actual job description content
-    for i in range(start_idx, len(lines)):
-        line = lines[i].strip()
-        if line and not line.startswith('Does this look okay?'):
-            job_desc_lines.append(line)
-        elif line.startswith('Does this look okay?'):
-            break
+    # Cut everything from the approval question onwards
+    end = _APPROVAL_PROMPT_RE.search(text)
+    if end:
+        text = text[:end.start()]
     
-    return '\n'.join(job_desc_lines).strip()
+    # Keep the non-empty lines, stripped
+    return '\n'.join(filter(None, map(str.strip, text.split('\n'))))
+
+
+def _strip_bullet(line: str) -> str:
+    return _BULLET_RE.sub('', line, count=1).strip()
+
+
+def try_deterministic_edit(job_description: str, edit_instructions: str) -> Optional[str]:
+    """
+    Apply simple find/replace, line-removal or field-overwrite instructions directly.
+
+    Args:
+        job_description: Job description to edit
+        edit_instructions: User's edit instructions
+
+    Returns:
+        Updated job description, or None if the instruction needs the LLM
+    """
+    updated = None
+
+    match = _REPLACE_RE.match(edit_instructions)
+    if match and match.group(2) in job_description:
+        updated = job_description.replace(match.group(2), match.group(4))
+
+    if updated is None:
+        match = _REMOVE_RE.match(edit_instructions)
+        if match:
+            target = match.group(2).strip().lower()
+            lines = job_description.split('\n')
+            # Remove the lines that are exactly the target once the bullet is stripped,
+            # else the one line containing it; anything ambiguous goes to the LLM
+            matches = [i for i, line in enumerate(lines) if _strip_bullet(line).lower() == target]
+            if not matches:
+                matches = [i for i, line in enumerate(lines) if target in line.lower()]
+                if len(matches) != 1:
+                    matches = []
+            if matches:
+                drop = set(matches)
+                updated = '\n'.join(line for i, line in enumerate(lines) if i not in drop)
+
+    if updated is None:
+        match = _FIELD_CHANGE_RE.match(edit_instructions)
+        if match:
+            value = match.group(2).strip('"\'')
+            field_re = _FIELD_LINE_RES[match.group(1).lower()]
+            replaced, count = field_re.subn(lambda m: m.group(1) + value, job_description, count=1)
+            if count:
+                updated = replaced
+
+    return updated
 
 
 def send_updated_job_to_slack(channel_id: str, updated_description: str, 
-                             user_id: str, username: str, slack_handler=None) -> bool:
+                             user_id: str, username: str, slack_handler=None,
+                             message_ts: Optional[str] = None) -> bool:
     """
     Send updated job description to Slack with approval buttons.
     
@@ -142,20 +387,24 @@ def send_updated_job_to_slack(channel_id: str, updated_description: str,
         user_id: User ID
         username: User's display name
         slack_handler: Slack handler instance
+        message_ts: Existing message (e.g. the streamed draft) to replace instead of posting a new one
         
     Returns:
         True if sent successfully, False otherwise
     """
     try:
-        from maya_agent.slack_button_n import send_job_desc
+        from maya_agent.slack_button_n import send_job_desc, update_job_desc
         
         # Generate new job ID for the updated description
-        job_id = str(uuid.uuid4())[:8]
+        job_id = uuid.uuid4().hex[:8]
         
         logger.info(f"Sending updated job description to Slack for user {user_id}")
         
         # Send the updated job description with approval buttons
-        action = send_job_desc(channel_id, updated_description, job_id, username, user_id)
+        if message_ts:
+            update_job_desc(channel_id, message_ts, updated_description, job_id, username, user_id)
+        else:
+            send_job_desc(channel_id, updated_description, job_id, username, user_id)
         
         logger.info(f"Updated job description sent successfully for user {user_id}")
         return True
@@ -1,12 +1,19 @@
-import json
 import os
-from typing import Dict, Any, Optional
+import tempfile
+import threading
+from typing import Callable, Dict, Any, Optional, Tuple
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
-# Path to the edit state file
-EDIT_STATE_FILE = "edit_mode.json"
+# Path to the edit state file, at the repo root where edit_formatter, rag_func and
+# the other modules that open it directly look for it (independent of the CWD)
+EDIT_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "edit_mode.json")
+
+# Pretty-print the state file only when debugging; compact output otherwise
+_DUMP_OPTIONS = orjson.OPT_INDENT_2 if os.getenv('DEBUG', 'False').lower() == 'true' else 0
 
 
 def load_state() -> Dict[str, Any]:
@@ -21,11 +28,11 @@ def load_state() -> Dict[str, Any]:
             logger.info(f"Edit state file {EDIT_STATE_FILE} not found, returning empty state")
             return {}
         
-        with open(EDIT_STATE_FILE, 'r', encoding='utf-8') as f:
-            state = json.load(f)
+        with open(EDIT_STATE_FILE, 'rb') as f:
+            state = orjson.loads(f.read())
             logger.debug(f"Loaded edit state for {len(state)} users")
             return state
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Invalid JSON in {EDIT_STATE_FILE}: {e}")
         return {}
     except Exception as e:
@@ -43,13 +50,65 @@ def save_state(state: Dict[str, Any]) -> bool:
     Returns:
         True if saved successfully, False otherwise
     """
+    tmp_path = None
     try:
-        with open(EDIT_STATE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(state, f, indent=2, ensure_ascii=False)
+        # Unique temp name, so concurrent writers never share a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(EDIT_STATE_FILE), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(state, option=_DUMP_OPTIONS))
+        os.replace(tmp_path, EDIT_STATE_FILE)
         logger.debug(f"Saved edit state for {len(state)} users")
         return True
     except Exception as e:
         logger.error(f"Error saving edit state: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def _file_mtime() -> Optional[int]:
+    try:
+        return os.stat(EDIT_STATE_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+# In-memory copy of EDIT_STATE_FILE, loaded once at import. Other modules read the
+# file directly, so it is reloaded whenever its mtime changes and every change made
+# here is written through to the file immediately. All writes go through this module.
+_LOCK = threading.RLock()
+_STATE_MTIME = _file_mtime()
+_STATE: Dict[str, Any] = load_state()
+
+
+def _current_state() -> Dict[str, Any]:
+    """Return the cached state, reloading it if the file changed on disk. Caller holds _LOCK."""
+    global _STATE, _STATE_MTIME
+    mtime = _file_mtime()
+    if mtime != _STATE_MTIME:
+        _STATE_MTIME = mtime
+        _STATE = load_state()
+    return _STATE
+
+
+def _mutate(fn: Callable[[Dict[str, Any]], bool]) -> Optional[bool]:
+    """
+    Apply fn to the current file contents in one read-modify-write.
+    
+    fn returns True if it changed the state; only then is the file rewritten.
+    Returns None if nothing changed, otherwise whether the write succeeded.
+    """
+    global _STATE, _STATE_MTIME
+    with _LOCK:
+        state = _current_state()
+        if not fn(state):
+            return None
+        if save_state(state):
+            _STATE_MTIME = _file_mtime()
+            return True
+        # Keep the cache in line with the file that is actually on disk
+        _STATE_MTIME = _file_mtime()
+        _STATE = load_state()
         return False
 
 
@@ -63,30 +122,40 @@ def get_user_edit_status(user_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         User's edit state dict if exists, None otherwise
     """
-    state = load_state()
-    return state.get(user_id)
+    with _LOCK:
+        return _current_state().get(user_id)
 
 
-def set_user_edit_mode(user_id: str, message: str) -> bool:
+def set_user_edit_mode(user_id: str, message: str, **details: Any) -> bool:
     """
     Set a user to edit mode with the original message.
     
     Args:
         user_id: User ID
         message: Original job description message
+        **details: Extra fields stored with the entry (job_id, channel_id, job_data, ...)
         
     Returns:
         True if set successfully, False otherwise
     """
-    state = load_state()
-    state[user_id] = {
-        "status": True,
-        "message": message
-    }
-    result = save_state(state)
-    if result:
-        logger.info(f"Set user {user_id} to edit mode")
-    return result
+    with _LOCK:
+        new_state = {
+            "status": True,
+            "message": message,
+            **details
+        }
+        def apply(state):
+            if state.get(user_id) == new_state:
+                return False
+            state[user_id] = new_state
+            return True
+        saved = _mutate(apply)
+        if saved is None:
+            return True  # Already in edit mode with this message
+        if not saved:
+            return False
+    logger.info(f"Set user {user_id} to edit mode")
+    return True
 
 
 def clear_user_edit_mode(user_id: str) -> bool:
@@ -99,14 +168,82 @@ def clear_user_edit_mode(user_id: str) -> bool:
     Returns:
         True if cleared successfully, False otherwise
     """
-    state = load_state()
-    if user_id in state:
-        state[user_id]["status"] = False
-        result = save_state(state)
-        if result:
-            logger.info(f"Cleared edit mode for user {user_id}")
-        return result
-    return True  # User not in edit mode, nothing to clear
+    with _LOCK:
+        def apply(state):
+            user_state = state.get(user_id)
+            if not user_state or user_state.get("status") is False:
+                return False
+            user_state["status"] = False
+            return True
+        saved = _mutate(apply)
+        if saved is None:
+            return True  # User not in edit mode, nothing to clear
+        if not saved:
+            return False
+    logger.info(f"Cleared edit mode for user {user_id}")
+    return True
+
+
+def update_user_edit_state(user_id: str, fields: Dict[str, Any], create: bool = True) -> bool:
+    """
+    Set fields on a user's edit state entry in one read-modify-write.
+    
+    Args:
+        user_id: User ID
+        fields: Keys to set on the entry (status, free, message, ...)
+        create: Create the entry if the user has none, instead of leaving it absent
+        
+    Returns:
+        True if updated (or already up to date), False otherwise
+    """
+    def apply(state):
+        user_state = state.get(user_id)
+        if user_state is None:
+            if not create:
+                return False
+            user_state = state[user_id] = {}
+        elif all(key in user_state and user_state[key] == value for key, value in fields.items()):
+            return False
+        user_state.update(fields)
+        return True
+    return _mutate(apply) is not False
+
+
+def setdefault_user_edit_state(user_id: str, defaults: Dict[str, Any]) -> bool:
+    """
+    Fill in the fields missing from a user's edit state entry, creating it if needed.
+    
+    Args:
+        user_id: User ID
+        defaults: Values for the keys the entry doesn't have yet
+        
+    Returns:
+        True if updated (or nothing was missing), False otherwise
+    """
+    def apply(state):
+        user_state = state.get(user_id) or {}
+        missing = {key: value for key, value in defaults.items() if key not in user_state}
+        if not missing:
+            return False
+        state.setdefault(user_id, user_state).update(missing)
+        return True
+    return _mutate(apply) is not False
+
+
+def get_edit_context(user_id: str) -> Optional[Tuple[bool, str]]:
+    """
+    Get a user's edit mode status and original message in a single state lookup.
+    
+    Args:
+        user_id: User ID
+        
+    Returns:
+        (True, original message) if user is in edit mode, None otherwise
+    """
+    user_state = get_user_edit_status(user_id)
+    if not user_state or user_state.get("status", False) is not True:
+        return None
+    return True, user_state.get("message")
 
 
 def is_user_in_edit_mode(user_id: str) -> bool:
@@ -119,8 +256,7 @@ def is_user_in_edit_mode(user_id: str) -> bool:
     Returns:
         True if user is in edit mode, False otherwise
     """
-    user_state = get_user_edit_status(user_id)
-    return user_state is not None and user_state.get("status", False) is True
+    return get_edit_context(user_id) is not None
 
 
 def get_user_original_message(user_id: str) -> Optional[str]:
@@ -133,7 +269,5 @@ def get_user_original_message(user_id: str) -> Optional[str]:
     Returns:
         Original message if user is in edit mode, None otherwise
     """
-    user_state = get_user_edit_status(user_id)
-    if user_state and user_state.get("status", False):
-        return user_state.get("message")
-    return None 
\ No newline at end of file
+    context = get_edit_context(user_id)
+    return context[1] if context else None
@@ -1,13 +1,26 @@
 from langchain.prompts import ChatPromptTemplate
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from maya_agent.naveens_agent import naveen
+from maya_agent.naveens_agent import naveen, delete_user_data, post_job_to_linkedin
+from maya_agent.slack_button_n import send_job_desc
+import atexit
 import json
 import logging
+import orjson
 import sqlite3
+import time
 from datetime import datetime, timedelta
 import os
 import re
-from maya_agent.database import get_latest_user_draft
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+from functools import lru_cache
+from cachetools import TTLCache
+from maya_agent.database import get_conn, get_latest_user_draft
+from edit_state_manager import set_user_edit_mode
 # from redis_manager import RedisManager # No longer needed
 # redis_manager = RedisManager() # No longer needed
 # Initialize logger
@@ -16,50 +29,130 @@ logger = logging.getLogger(__name__)
 # Database configuration
 DB_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'database', 'job_drafts.db'))
 
+# Model used for intent/entity extraction (invoked at its default, near-deterministic settings,
+# which is what makes caching its responses per message safe)
+INTENT_MODEL = "meta/llama3-70b-instruct"
+
+# Greetings, thanks and other small talk that can be answered without calling the LLM
+# (optionally followed by punctuation or Slack emoji codes like :wave:)
+_GREETING_RE = re.compile(
+    r'^\s*(hi|hello|hey|thanks|thank you|ok|okay|bye|good (morning|afternoon|evening|night))'
+    r'(\s*[!.?]|\s*:[\w+-]+:)*\s*$',
+    re.I
+)
+_TRIVIAL_MIN_LEN = 3
+
+# Worker threads for per-message intent extraction (LLM calls are I/O-bound and independent)
+_INTENT_EXEC = ThreadPoolExecutor(max_workers=8, thread_name_prefix="intent")
+
+# Background threads for Slack replies, so posting a reply doesn't hold up the next message
+_SLACK_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="slack-post")
+atexit.register(_SLACK_EXECUTOR.shutdown, wait=True)
+
+# Specific job action pattern - one scan for edit/delete/show followed by a job_xxx or xxx id,
+# with optional space or underscore
+_ACTION_RE = re.compile(r'(?P<op>edit|delete|show)[\s_]+(?:job_)?(?P<id>[a-zA-Z0-9_]{4,})')
+_LINKEDIN_URL_RE = re.compile(r'https://www\.linkedin\.com/feed/update/\S+')
+
+# One long-lived connection per thread to the intent cache database (see _cache_conn)
+_tls = threading.local()
+_PRAGMAS = ('journal_mode=WAL', 'synchronous=normal', 'temp_store=memory', 'cache_size=-64000')
+
+def _get(row, key, default=None):
+    """Column value by name, falling back to default for missing or NULL columns"""
+    try:
+        value = row[key]
+    except IndexError:
+        return default
+    return value if value is not None else default
+
+class _DraftRow(sqlite3.Row):
+    """sqlite3.Row with a dict-style get(), so rows are read by name without building a dict each"""
+    get = _get
+
+@contextmanager
+def _conn():
+    """maya_agent.database's pooled connection, returning _DraftRow rows until it is released"""
+    with get_conn() as conn:
+        conn.row_factory = _DraftRow
+        yield conn
+
 # Database utility functions
 def get_user_drafts(user_id, limit=10):
     """Fetch user's job drafts from database"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+        with _conn() as conn:
+            return conn.execute("""
+                SELECT * FROM drafts 
+                WHERE user_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, (user_id, limit)).fetchall()
         
-        cursor.execute("""
-            SELECT * FROM drafts 
-            WHERE user_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, (user_id, limit))
+    except Exception as e:
+        logger.error(f"Error fetching user drafts: {e}")
+        return []
+
+def get_user_drafts_summary(user_id, limit=10):
+    """Fetch only the fields the summary listings show (job_id, job_title, timestamp)"""
+    try:
+        with _conn() as conn:
+            return conn.execute("""
+                SELECT job_id, job_title, timestamp FROM drafts 
+                WHERE user_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, (user_id, limit)).fetchall()
         
-        rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        conn.close()
+    except Exception as e:
+        logger.error(f"Error fetching user draft summaries: {e}")
+        return []
+
+def get_user_draft_by_id(user_id, job_id):
+    """Fetch a single draft of the user's by job_id, or None"""
+    try:
+        with _conn() as conn:
+            return conn.execute("""
+                SELECT * FROM drafts 
+                WHERE user_id = ? AND job_id = ? 
+                LIMIT 1
+            """, (user_id, job_id)).fetchone()
         
-        return [dict(zip(columns, row)) for row in rows]
+    except Exception as e:
+        logger.error(f"Error fetching user draft {job_id}: {e}")
+        return None
+
+def get_draft_stats(user_id, days=30):
+    """Return (total drafts, drafts from the last `days` days) for a user, counted in SQL"""
+    try:
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        with _conn() as conn:
+            total, recent = conn.execute("""
+                SELECT COUNT(*), COUNT(CASE WHEN timestamp > ? THEN 1 END) 
+                FROM drafts 
+                WHERE user_id = ?
+            """, (cutoff, user_id)).fetchone()
+        return total, recent
         
     except Exception as e:
-        logger.error(f"Error fetching user drafts: {e}")
-        return []
+        logger.error(f"Error counting user drafts: {e}")
+        return 0, 0
 
 def get_user_edit_requests(user_id, limit=5):
     """Fetch user's edit requests from database"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM edit_requests 
-            WHERE user_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, (user_id, limit))
-        
-        rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        conn.close()
+        with _conn() as conn:
+            rows = conn.execute("""
+                SELECT * FROM edit_requests 
+                WHERE user_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, (user_id, limit)).fetchall()
         
         edit_requests = []
         for row in rows:
-            edit_request = dict(zip(columns, row))
+            # original_job_data is decoded in place, so these rows do need a dict
+            edit_request = dict(row)
             if edit_request.get('original_job_data'):
                 try:
                     edit_request['original_job_data'] = json.loads(edit_request['original_job_data'])
@@ -76,35 +169,61 @@ def get_user_edit_requests(user_id, limit=5):
 def delete_user_draft(job_id, user_id):
     """Delete a specific user's draft"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT job_id FROM drafts WHERE job_id = ? AND user_id = ?", (job_id, user_id))
-        
-        if cursor.fetchone():
-            cursor.execute("DELETE FROM drafts WHERE job_id = ? AND user_id = ?", (job_id, user_id))
-            conn.commit()
-            conn.close()
-            return True
-        else:
-            conn.close()
-            return False
+        # The inner `with conn` commits the delete
+        with _conn() as conn, conn:
+            cursor = conn.execute("DELETE FROM drafts WHERE job_id = ? AND user_id = ?", (job_id, user_id))
+        _invalidate_drafts_cache(user_id)
+        return cursor.rowcount > 0
             
     except Exception as e:
         logger.error(f"Error deleting user draft: {e}")
         return False
 
+# Short-lived cache of full draft listings, so statistics, search and export requests
+# for the same user in quick succession share one query
+DRAFTS_CACHE_TTL_SECONDS = 30
+_drafts_cache = TTLCache(maxsize=256, ttl=DRAFTS_CACHE_TTL_SECONDS)
+_drafts_cache_lock = threading.Lock()
+
+def _drafts_cached(user_id, limit=1000):
+    """get_user_drafts(user_id, limit), served from a TTL cache keyed by (user_id, limit)"""
+    key = (user_id, limit)
+    with _drafts_cache_lock:
+        drafts = _drafts_cache.get(key)
+    if drafts is None:
+        drafts = get_user_drafts(user_id, limit=limit)
+        with _drafts_cache_lock:
+            _drafts_cache[key] = drafts
+    return drafts
+
+def _invalidate_drafts_cache(user_id):
+    """Drop a user's cached draft listings after their drafts change"""
+    with _drafts_cache_lock:
+        for key in [key for key in _drafts_cache if key[0] == user_id]:
+            _drafts_cache.pop(key, None)
+        _search_index_cache.pop(user_id, None)
+
+@lru_cache(maxsize=2048)
+def _parse_ts(ts):
+    """Parse a stored ISO timestamp (trailing Z allowed), or None if it isn't one"""
+    try:
+        return datetime.fromisoformat(ts.replace('Z', '+00:00'))
+    except Exception:
+        return None
+
+@lru_cache(maxsize=2048)
+def _fmt_ts(ts):
+    """Display form of a stored timestamp, as used by the draft formatters"""
+    dt = _parse_ts(ts)
+    return dt.strftime('%Y-%m-%d %H:%M') if dt else 'Unknown date'
+
 def format_draft_summary(draft):
     """Format a draft for summary display - shows only job_title, job_id, timestamp"""
     job_title = draft.get('job_title', 'Untitled Job')
     job_id = draft.get('job_id', 'unknown')
     timestamp = draft.get('timestamp', '')
     
-    try:
-        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        formatted_date = dt.strftime('%Y-%m-%d %H:%M')
-    except:
-        formatted_date = 'Unknown date'
+    formatted_date = _fmt_ts(timestamp)
     
     return f"• **{job_title}** (`{job_id}`) - {formatted_date}"
 
@@ -119,11 +238,7 @@ def format_draft_detailed(draft):
     timestamp = draft.get('timestamp', '')
     job_id = draft.get('job_id', 'unknown')
     
-    try:
-        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        formatted_date = dt.strftime('%Y-%m-%d %H:%M')
-    except:
-        formatted_date = 'Unknown date'
+    formatted_date = _fmt_ts(timestamp)
     
     return f"""🔹 **{job_title}** at {company}
 📋 Job ID: `{job_id}`
@@ -132,32 +247,8 @@ def format_draft_detailed(draft):
 🛠️ Skills: {skills}
 📅 Created: {formatted_date}"""
 
-def format_draft_with_description(draft):
-    """Format a draft with full details including description for hiring-style display"""
-    job_title = draft.get('job_title', 'Untitled Job')
-    company = draft.get('company', 'Unknown Company')
-    job_type = draft.get('job_type', 'Not specified')
-    experience = draft.get('experience', 'Not specified')
-    location = draft.get('location', 'Not specified')
-    skills = draft.get('skills', 'Not specified')
-    timestamp = draft.get('timestamp', '')
-    job_id = draft.get('job_id', 'unknown')
-    description = draft.get('description', 'No description available')
-    number_of_people = draft.get('number_of_people', 'Not specified')
-    expiration_date = draft.get('expiration_date', 'Not specified')
-    education = draft.get('education', 'Not specified')
-    mail = draft.get('mail', 'Not specified')
-    url = draft.get('url', 'Not specified')
-    city = draft.get('city', 'Not specified')
-    state = draft.get('state', 'Not specified')
-    
-    try:
-        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        formatted_date = dt.strftime('%Y-%m-%d %H:%M')
-    except:
-        formatted_date = 'Unknown date'
-    
-    return f"""🚀 **{job_title}** at {company}
+# Hiring-style detail view; fields the draft doesn't have fall back via _DraftView
+_DETAIL_TPL = """🚀 **{job_title}** at {company}
 📋 Job ID: `{job_id}`
 
 **📄 Job Details:**
@@ -174,14 +265,33 @@ def format_draft_with_description(draft):
 
 **📝 Description:**
 {description}"""
+_DETAIL_DEFAULTS = {
+    'job_title': 'Untitled Job',
+    'company': 'Unknown Company',
+    'job_id': 'unknown',
+    'description': 'No description available',
+}
+
+class _DraftView(dict):
+    """Template mapping that supplies the display default for any missing field"""
+    def __missing__(self, key):
+        return _DETAIL_DEFAULTS.get(key, 'Not specified')
+
+def format_draft_with_description(draft):
+    """Format a draft with full details including description for hiring-style display"""
+    view = _DraftView((key, draft[key]) for key in draft.keys() if draft[key] is not None)
+    view['formatted_date'] = _fmt_ts(view.get('timestamp', ''))
+    return _DETAIL_TPL.format_map(view)
 
 def format_draft_for_slack(draft):
     """Backward compatibility function - uses summary format by default"""
     return format_draft_summary(draft)
 
 def format_relative_time(timestamp):
+    dt = _parse_ts(timestamp)
+    if dt is None:
+        return "recently"
     try:
-        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
         delta = datetime.now() - dt
         if delta.days > 0:
             return f"{delta.days}d ago"
@@ -195,302 +305,268 @@ def format_relative_time(timestamp):
     except:
         return "recently"
 
-def handle_specific_job_action(message_text, user_data, slack_handler):
-    """Enhanced handler for specific job actions with different display formats"""
-    user_id = user_data.get('user_id')
-    username = user_data.get('username', 'there')
-    channel_id = user_data.get('channel_id')
-    
-    print(f"🔍 Checking specific job action for message: '{message_text}'")
-    
-    # Patterns that match both job_xxx and xxx formats, with optional space or underscore
-    edit_pattern = r'edit[\s_]+(job_)?([a-zA-Z0-9_]{4,})'
-    delete_pattern = r'delete[\s_]+(job_)?([a-zA-Z0-9_]{4,})'
-    show_pattern = r'show[\s_]+(job_)?([a-zA-Z0-9_]{4,})'  # Pattern for showing specific jobs
-    
-    edit_match = re.search(edit_pattern, message_text.lower())
-    delete_match = re.search(delete_pattern, message_text.lower())
-    show_match = re.search(show_pattern, message_text.lower())
-    
-    print(f"🔍 Pattern matches - Edit: {edit_match}, Delete: {delete_match}, Show: {show_match}")
-    
-    try:
-        if delete_match:
-            job_id = delete_match.group(2)  # Get the actual job_id (second group)
-            print(f"🗑️ Delete request for job_id: {job_id}")
-            
-            success = delete_user_draft(job_id, user_id)
-            
-            if success:
-                message = f"✅ **Job Deleted Successfully**\n\n" \
-                         f"Job `{job_id}` has been permanently deleted, {username}.\n" \
-                         f"This action cannot be undone."
-            else:
-                message = f"❌ **Delete Failed**\n\n" \
-                         f"Could not delete job `{job_id}`. Possible reasons:\n" \
-                         f"• Job ID doesn't exist\n" \
-                         f"• Job doesn't belong to you\n" \
-                         f"• Database error\n\n" \
-                         f"Try `show my posts` to see your available jobs."
-            
-            slack_handler._post_response(
-                channel_id=channel_id,
-                thread_ts=user_data.get('thread_ts'),
-                text=message
-            )
-            return True
-            
-        elif show_match:
-            job_id = show_match.group(2)  # Get the actual job_id (second group)
-            print(f"👁️ Show request for job_id: {job_id}")
-            
-            drafts = get_user_drafts(user_id, limit=100)
-            target_job = next((draft for draft in drafts if draft.get('job_id') == job_id), None)
-            
-            if target_job:
-                # Get the job description
-                description = target_job.get('description', 'No description available')
-                
-                # Call send_job_desc to show the job with approval buttons
+def _handle_delete_job(job_id, user_id, username, channel_id, user_data, slack_handler):
+    """Delete one of the user's drafts"""
+    logger.debug("🗑️ Delete request for job_id: %s", job_id)
+
+    success = delete_user_draft(job_id, user_id)
+
+    if success:
+        message = f"✅ **Job Deleted Successfully**\n\n" \
+                 f"Job `{job_id}` has been permanently deleted, {username}.\n" \
+                 f"This action cannot be undone."
+    else:
+        message = f"❌ **Delete Failed**\n\n" \
+                 f"Could not delete job `{job_id}`. Possible reasons:\n" \
+                 f"• Job ID doesn't exist\n" \
+                 f"• Job doesn't belong to you\n" \
+                 f"• Database error\n\n" \
+                 f"Try `show my posts` to see your available jobs."
+
+    slack_handler._post_response(
+        channel_id=channel_id,
+        thread_ts=user_data.get('thread_ts'),
+        text=message
+    )
+    return True
+
+def _handle_show_job(job_id, user_id, username, channel_id, user_data, slack_handler):
+    """Show a draft with the approval buttons and act on the response"""
+    logger.debug("👁️ Show request for job_id: %s", job_id)
+
+    target_job = get_user_draft_by_id(user_id, job_id)
+
+    if target_job:
+        # Get the job description
+        description = target_job.get('description', 'No description available')
+
+        # Call send_job_desc to show the job with approval buttons
+        try:
+            action = send_job_desc(channel_id, description, job_id, username, user_id)
+
+            # Handle the user's response - same logic as in naveens_agent.py
+            if action == "approve":
+                logger.debug("✅ Approved by user. Proceeding to LinkedIn...")
+                # Delete user data from vectorstore
                 try:
-                    from maya_agent.slack_button_n import send_job_desc
-                    action = send_job_desc(channel_id, description, job_id, username, user_id)
-                    
-                    # Handle the user's response - same logic as in naveens_agent.py
-                    if action == "approve":
-                        print("✅ Approved by user. Proceeding to LinkedIn...")
-                        # Delete user data from vectorstore
-                        try:
-                            from maya_agent.naveens_agent import delete_user_data
-                            delete_user_data(user_id)
-                        except Exception as e:
-                            print(f"❌ Error deleting user data: {e}")
-                        
-                        # Post to LinkedIn
-                        try:
-                            from maya_agent.naveens_agent import post_job_to_linkedin
-                            # Create a state object similar to what post_job_to_linkedin expects
-                            job_data = target_job.copy()
-                            job_data["llm_description"] = description
-                            
-                            # Call LinkedIn posting function
-                            post_result = post_job_to_linkedin({"job_data": job_data, "error": None, "job_result": "", "edit_workflow_active": None})
-                            
-                            job_result = post_result.get("job_result", "")
-                            if "✅ Posted:" in job_result:
-                                # Extract the LinkedIn URL from the result
-                                if "https://www.linkedin.com/feed/update/" in job_result:
-                                    # Extract the URL from the result
-                                    url_match = re.search(r'https://www\.linkedin\.com/feed/update/[^\s]+', job_result)
-                                    if url_match:
-                                        linkedin_url = url_match.group(0)
-                                        message = f"✅ <@{user_id}>, your job has been posted to LinkedIn successfully!\n\n🔗 **LinkedIn Post:** {linkedin_url}"
-                                    else:
-                                        message = f"✅ <@{user_id}>, your job has been posted to LinkedIn successfully!"
-                                else:
-                                    message = f"✅ <@{user_id}>, your job has been posted to LinkedIn successfully!"
-                            else:
-                                message = f"❌ <@{user_id}>, there was an error posting to LinkedIn: {job_result}"
-                        except Exception as e:
-                            print(f"❌ Error posting to LinkedIn: {e}")
-                            message = f"❌ <@{user_id}>, there was an error posting to LinkedIn."
-                            
-                        from maya_agent.naveens_agent import delete_user_data
-                        delete_user_data(user_id)
-                        delete_user_draft(job_id, user_id)
-                        
-                        slack_handler._post_response(
-                            channel_id=channel_id,
-                            thread_ts=user_data.get('thread_ts'),
-                            text=message
-                        )
-                            
-                    elif action == "reject":
-                        print("🧹 User rejected. Resetting memory and halting job.")
-                        # Delete user data from vectorstore
-                        try:
-                            from maya_agent.naveens_agent import delete_user_data
-                            delete_user_data(user_id)
-                        except Exception as e:
-                            print(f"❌ Error deleting user data: {e}")
-                        
-                        message = f"❌ <@{user_id}>, I've canceled the posting and cleared your data."
-                        slack_handler._post_response(
-                            channel_id=channel_id,
-                            thread_ts=user_data.get('thread_ts'),
-                            text=message
-                        )
-                        
-                    elif action == "edit":
-                        print("User clicked edit, initiating edit workflow")
-
-                        # get job title, company,experience,location,skills
-                        job = get_latest_user_draft(user_id)
-
-                        # Fix the file path to access edit_mode.json from root directory
-                        edit_mode_path = os.path.join(os.path.dirname(__file__), '..', 'edit_mode.json')
-                        try:
-                            with open(edit_mode_path,'r') as f:
-                                content = f.read().strip()
-                                if not content:
-                                    # File is empty, initialize with empty dict
-                                    edit_mode = {}
-                                else:
-                                    edit_mode = json.loads(content)
-                        except FileNotFoundError:
-                            # File doesn't exist, create with empty dict
-                            edit_mode = {}
-                        except json.JSONDecodeError as e:
-                            print(f"Warning: Invalid JSON in edit_mode.json: {e}")
-                            edit_mode = {}
-                        
-                        # Store both status and the original message to be edited
-                        edit_mode[user_id] = {
-                            "status": True,
-                            "message": description,
-                            "job_id": job_id,
-                            "channel_id":channel_id,
-                            "user_name":username,
-                            "job_data":job
-                  
-                        }
-                        
-                        with open(edit_mode_path,'w') as f:
-                            json.dump(edit_mode,f)
-                        
-                        # Send the message to user asking for feedback
-                        message = f"✏ <@{user_id}>, I'm ready to help you edit the job description!\n\n"
-                        message += f"**Current Job Details:**\n"
-                        message += f"• Title: {job.get('job_title', 'N/A')}\n"
-                        message += f"• Company: {job.get('company', 'N/A')}\n"
-                        message += f"• Experience: {job.get('experience', 'N/A')}\n"
-                        message += f"• Location: {job.get('location', 'N/A')}\n"
-                        message += f"• Skills: {job.get('skills', 'N/A')}\n\n"
-                        message += f"**What would you like to change?**\n"
-                        message += f"Examples:\n"
-                        message += f"• \"Change the title to Senior Developer\"\n"
-                        message += f"• \"Update skills to include React and Node.js\"\n"
-                        message += f"• \"Change location to Remote\"\n"
-                        message += f"• \"Update experience requirement to 5+ years\"\n"
-                        message += f"• \"Add salary range $80k-$120k\"\n\n"
-                        message += f"Just tell me what you'd like to modify!"
-                                
-                            
-                        slack_handler._post_response(
-                                channel_id=channel_id,
-                                thread_ts=user_data.get('thread_ts'),
-                                text=message
-                            )
-                        
-                    elif action == "draft":
-                        print("User selected draft, saving as draft")
-                        try:
-                            from maya_agent.database import insert_draft
-                            # The job is already in the database, so we just need to confirm
-                            draft_confirmation = f"✅ <@{user_id}>, this job is already saved as a draft!\n\n" \
-                                               f"📋 **Draft Details:**\n" \
-                                               f"• Job Title: {target_job.get('job_title', 'N/A')}\n" \
-                                               f"• Company: {target_job.get('company', 'N/A')}\n" \
-                                               f"• Job ID: `{job_id}`\n\n" \
-                                               f"💡 **To manage your drafts:**\n" \
-                                               f"• Say \"show my posts\" to view all your drafts\n" \
-                                               f"• Say \"edit {job_id}\" to modify this draft\n" \
-                                               f"• Say \"delete {job_id}\" to remove this draft"
-                        except Exception as e:
-                            print(f"❌ Error handling draft action: {e}")
-                            draft_confirmation = f"📋 <@{user_id}>, this job is already saved as a draft with ID `{job_id}`."
-                        
-                        slack_handler._post_response(
-                            channel_id=channel_id,
-                            thread_ts=user_data.get('thread_ts'),
-                            text=draft_confirmation
-                        )
-                        
+                    delete_user_data(user_id)
+                except Exception:
+                    logger.exception("❌ Error deleting user data")
+
+                # Post to LinkedIn
+                try:
+                    # Create a state object similar to what post_job_to_linkedin expects
+                    job_data = dict(target_job)
+                    job_data["llm_description"] = description
+
+                    # Call LinkedIn posting function
+                    post_result = post_job_to_linkedin({"job_data": job_data, "error": None, "job_result": "", "edit_workflow_active": None})
+
+                    job_result = post_result.get("job_result", "")
+                    if "✅ Posted:" in job_result:
+                        # Extract the LinkedIn URL from the result
+                        url_match = _LINKEDIN_URL_RE.search(job_result)
+                        if url_match:
+                            message = f"✅ <@{user_id}>, your job has been posted to LinkedIn successfully!\n\n🔗 **LinkedIn Post:** {url_match.group(0)}"
+                        else:
+                            message = f"✅ <@{user_id}>, your job has been posted to LinkedIn successfully!"
                     else:
-                        message = f"ℹ️ <@{user_id}>, job `{job_id}` displayed successfully."
-                        slack_handler._post_response(
-                            channel_id=channel_id,
-                            thread_ts=user_data.get('thread_ts'),
-                            text=message
-                        )
-                except Exception as e:
-                    print(f"❌ Error calling send_job_desc: {e}")
-                    # Fallback to direct message if send_job_desc fails
-                    message = f"📋 **Job Details for {job_id}**\n\n"
-                    message += format_draft_with_description(target_job)
-                    message += f"\n\n💡 **Actions Available:**\n"
-                    message += f"• `edit {job_id}` - Modify this job\n"
-                    message += f"• `delete {job_id}` - Remove this job"
-                    
-                    slack_handler._post_response(
+                        message = f"❌ <@{user_id}>, there was an error posting to LinkedIn: {job_result}"
+                except Exception:
+                    logger.exception("❌ Error posting to LinkedIn")
+                    message = f"❌ <@{user_id}>, there was an error posting to LinkedIn."
+
+                delete_user_data(user_id)
+                delete_user_draft(job_id, user_id)
+
+                slack_handler._post_response(
+                    channel_id=channel_id,
+                    thread_ts=user_data.get('thread_ts'),
+                    text=message
+                )
+
+            elif action == "reject":
+                logger.debug("🧹 User rejected. Resetting memory and halting job.")
+                # Delete user data from vectorstore
+                try:
+                    delete_user_data(user_id)
+                except Exception:
+                    logger.exception("❌ Error deleting user data")
+
+                message = f"❌ <@{user_id}>, I've canceled the posting and cleared your data."
+                slack_handler._post_response(
+                    channel_id=channel_id,
+                    thread_ts=user_data.get('thread_ts'),
+                    text=message
+                )
+
+            elif action == "edit":
+                logger.debug("User clicked edit, initiating edit workflow")
+
+                # get job title, company,experience,location,skills
+                job = get_latest_user_draft(user_id)
+
+                # Store both status and the original message to be edited; the state
+                # manager updates this one entry in memory and writes it back in the background
+                set_user_edit_mode(
+                    user_id,
+                    description,
+                    job_id=job_id,
+                    channel_id=channel_id,
+                    user_name=username,
+                    job_data=job
+                )
+
+                # Send the message to user asking for feedback
+                message = "".join([
+                    f"✏ <@{user_id}>, I'm ready to help you edit the job description!\n\n",
+                    "**Current Job Details:**\n",
+                    f"• Title: {job.get('job_title', 'N/A')}\n",
+                    f"• Company: {job.get('company', 'N/A')}\n",
+                    f"• Experience: {job.get('experience', 'N/A')}\n",
+                    f"• Location: {job.get('location', 'N/A')}\n",
+                    f"• Skills: {job.get('skills', 'N/A')}\n\n",
+                    "**What would you like to change?**\n",
+                    "Examples:\n",
+                    "• \"Change the title to Senior Developer\"\n",
+                    "• \"Update skills to include React and Node.js\"\n",
+                    "• \"Change location to Remote\"\n",
+                    "• \"Update experience requirement to 5+ years\"\n",
+                    "• \"Add salary range $80k-$120k\"\n\n",
+                    "Just tell me what you'd like to modify!",
+                ])
+
+
+                slack_handler._post_response(
                         channel_id=channel_id,
                         thread_ts=user_data.get('thread_ts'),
                         text=message
                     )
+
+            elif action == "draft":
+                logger.debug("User selected draft, saving as draft")
+                try:
+                    # The job is already in the database, so we just need to confirm
+                    draft_confirmation = f"✅ <@{user_id}>, this job is already saved as a draft!\n\n" \
+                                       f"📋 **Draft Details:**\n" \
+                                       f"• Job Title: {target_job.get('job_title', 'N/A')}\n" \
+                                       f"• Company: {target_job.get('company', 'N/A')}\n" \
+                                       f"• Job ID: `{job_id}`\n\n" \
+                                       f"💡 **To manage your drafts:**\n" \
+                                       f"• Say \"show my posts\" to view all your drafts\n" \
+                                       f"• Say \"edit {job_id}\" to modify this draft\n" \
+                                       f"• Say \"delete {job_id}\" to remove this draft"
+                except Exception:
+                    logger.exception("❌ Error handling draft action")
+                    draft_confirmation = f"📋 <@{user_id}>, this job is already saved as a draft with ID `{job_id}`."
+
+                slack_handler._post_response(
+                    channel_id=channel_id,
+                    thread_ts=user_data.get('thread_ts'),
+                    text=draft_confirmation
+                )
+
             else:
-                message = f"❌ **Job Not Found**\n\n" \
-                         f"Could not find job `{job_id}` in your postings.\n" \
-                         f"Try `show my posts` to see your available jobs."
-                
+                message = f"ℹ️ <@{user_id}>, job `{job_id}` displayed successfully."
                 slack_handler._post_response(
                     channel_id=channel_id,
                     thread_ts=user_data.get('thread_ts'),
                     text=message
                 )
-            return True
-            
-        elif edit_match:
-            job_id = edit_match.group(2)  # Get the actual job_id (second group)
-            print(f"✏️ Edit request for job_id: {job_id}")
-            
-            drafts = get_user_drafts(user_id, limit=100)
-            target_job = next((draft for draft in drafts if draft.get('job_id') == job_id), None)
-            
-            if target_job:
-                # Use detailed format for edit preview
-                message = f"✏️ **Edit Job: {target_job.get('job_title', 'Untitled')}**\n\n"
-                message += format_draft_detailed(target_job)
-                message += f"\n\n💡 **To edit this job:**\n"
-                message += f"Please tell me what you'd like to change. For example:\n"
-                message += f"• \"Change the title to Senior Developer\"\n"
-                message += f"• \"Update location to Remote\"\n"
-                message += f"• \"Add React to required skills\"\n\n"
-                message += f"I'll help you update job `{job_id}`!"
-            else:
-                message = f"❌ **Job Not Found**\n\n" \
-                         f"Could not find job `{job_id}` in your postings.\n" \
-                         f"Try `show my posts` to see your available jobs."
-            
+        except Exception:
+            logger.exception("❌ Error calling send_job_desc")
+            # Fallback to direct message if send_job_desc fails
+            message = "".join([
+                f"📋 **Job Details for {job_id}**\n\n",
+                format_draft_with_description(target_job),
+                "\n\n💡 **Actions Available:**\n",
+                f"• `edit {job_id}` - Modify this job\n",
+                f"• `delete {job_id}` - Remove this job",
+            ])
+
             slack_handler._post_response(
                 channel_id=channel_id,
                 thread_ts=user_data.get('thread_ts'),
                 text=message
             )
-            return True
-        
+    else:
+        message = f"❌ **Job Not Found**\n\n" \
+                 f"Could not find job `{job_id}` in your postings.\n" \
+                 f"Try `show my posts` to see your available jobs."
+
+        slack_handler._post_response(
+            channel_id=channel_id,
+            thread_ts=user_data.get('thread_ts'),
+            text=message
+        )
+    return True
+
+def _handle_edit_job(job_id, user_id, username, channel_id, user_data, slack_handler):
+    """Preview a draft the user wants to edit"""
+    logger.debug("✏️ Edit request for job_id: %s", job_id)
+
+    target_job = get_user_draft_by_id(user_id, job_id)
+
+    if target_job:
+        # Use detailed format for edit preview
+        message = "".join([
+            f"✏️ **Edit Job: {target_job.get('job_title', 'Untitled')}**\n\n",
+            format_draft_detailed(target_job),
+            "\n\n💡 **To edit this job:**\n",
+            "Please tell me what you'd like to change. For example:\n",
+            "• \"Change the title to Senior Developer\"\n",
+            "• \"Update location to Remote\"\n",
+            "• \"Add React to required skills\"\n\n",
+            f"I'll help you update job `{job_id}`!",
+        ])
+    else:
+        message = f"❌ **Job Not Found**\n\n" \
+                 f"Could not find job `{job_id}` in your postings.\n" \
+                 f"Try `show my posts` to see your available jobs."
+
+    slack_handler._post_response(
+        channel_id=channel_id,
+        thread_ts=user_data.get('thread_ts'),
+        text=message
+    )
+    return True
+
+_JOB_ACTION_HANDLERS = {
+    'delete': _handle_delete_job,
+    'show': _handle_show_job,
+    'edit': _handle_edit_job,
+}
+
+def handle_specific_job_action(message_text, user_data, slack_handler):
+    """Enhanced handler for specific job actions with different display formats"""
+    user_id = user_data.get('user_id')
+    username = user_data.get('username', 'there')
+    channel_id = user_data.get('channel_id')
+    
+    logger.debug("🔍 Checking specific job action for message: %r", message_text)
+    
+    text_lc = message_text.lower()
+    # Most messages contain none of the action verbs; skip the regex for them
+    if 'edit' not in text_lc and 'delete' not in text_lc and 'show' not in text_lc:
         return False
+    match = _ACTION_RE.search(text_lc)
+    
+    logger.debug("🔍 Pattern match: %s", match)
+    
+    if not match:
+        return False
+    
+    try:
+        handler = _JOB_ACTION_HANDLERS[match.group('op')]
+        return handler(match.group('id'), user_id, username, channel_id, user_data, slack_handler)
         
-    except Exception as e:
-        print(f"❌ Error handling specific job action: {e}")
-        logger.error(f"Specific job action error: {e}")
+    except Exception:
+        logger.exception("❌ Error handling specific job action")
         return False
 
-def handle_contextual_action(user_text, user_data, slack_handler):
-    user_id = user_data.get('user_id')
-    # context = redis_manager.get_user_context(user_id) # No longer needed
-    # job_id = context.get("active_job_id") # No longer needed
-    if False: # No longer needed
-        if "edit this" in user_text.lower():
-            return handle_edit_job(job_id, user_data, slack_handler)
-        elif "post this" in user_text.lower():
-            return handle_post_job(job_id, user_data, slack_handler)
-        elif "delete this" in user_text.lower():
-            return handle_delete_job(job_id, user_data, slack_handler)
-    return False
-
 def handle_past_request(response_dict, user_data, slack_handler):
     """Enhanced handle past request with different formatting based on request type"""
-    print(f"📋 PAST REQUEST detected for user: {user_data.get('username')}")
+    logger.debug("📋 PAST REQUEST detected for user: %s", user_data.get('username'))
     
     entities = response_dict.get('entities', {})
     request_type = entities.get('request_type', 'show')
@@ -499,31 +575,33 @@ def handle_past_request(response_dict, user_data, slack_handler):
     user_id = user_data.get('user_id')
     username = user_data.get('username', 'there')
     
-    print(f"Request type: {request_type}")
-    print(f"Channel: {channel_id}, User: {username}")
+    logger.debug("Request type: %s", request_type)
+    logger.debug("Channel: %s, User: %s", channel_id, username)
     
     if not slack_handler or not channel_id:
-        print("⚠️ No Slack handler available or missing channel_id - cannot post response")
+        logger.warning("⚠️ No Slack handler available or missing channel_id - cannot post response")
         return
     
     try:
         if request_type == 'show' or request_type is None:
             # Fetch and display user's drafts - USE SUMMARY FORMAT
-            print(f"📊 Fetching drafts for user {user_id}...")
-            drafts = get_user_drafts(user_id, limit=10)
+            logger.debug("📊 Fetching drafts for user %s...", user_id)
+            drafts = get_user_drafts_summary(user_id, limit=10)
             
             if drafts:
-                message = f"📋 **Your Job Postings** ({len(drafts)} found)\n\n"
+                parts = [f"📋 **Your Job Postings** ({len(drafts)} found)\n\n"]
                 
                 # Use summary format for listing
-                for draft in drafts:
-                    message += format_draft_summary(draft) + "\n"
+                parts.extend(format_draft_summary(draft) + "\n" for draft in drafts)
                 
-                message += f"\n💡 **What you can do:**\n"
-                message += f"• `show job_123` - View full details of a specific job\n"
-                message += f"• `edit job_123` - Edit a specific job\n"
-                message += f"• `delete job_123` - Remove a job\n"
-                message += f"• `show more` - See additional jobs"
+                parts.append(
+                    "\n💡 **What you can do:**\n"
+                    "• `show job_123` - View full details of a specific job\n"
+                    "• `edit job_123` - Edit a specific job\n"
+                    "• `delete job_123` - Remove a job\n"
+                    "• `show more` - See additional jobs"
+                )
+                message = "".join(parts)
                 
             else:
                 message = f"📭 **No Job Postings Found**\n\n" \
@@ -560,17 +638,16 @@ def handle_past_request(response_dict, user_data, slack_handler):
         
         elif request_type == 'delete':
             # Show drafts with delete instructions - USE SUMMARY FORMAT
-            drafts = get_user_drafts(user_id, limit=10)
+            drafts = get_user_drafts_summary(user_id, limit=10)
             
             if drafts:
-                message = f"🗑️ **Delete Job Postings**\n\n"
-                message += f"📋 **Your Jobs** ({len(drafts)} total):\n\n"
+                parts = ["🗑️ **Delete Job Postings**\n\n", f"📋 **Your Jobs** ({len(drafts)} total):\n\n"]
                 
-                for draft in drafts:
-                    message += format_draft_summary(draft) + "\n"
+                parts.extend(format_draft_summary(draft) + "\n" for draft in drafts)
                 
-                message += f"\n⚠️ **To delete:** Say `delete {drafts[0].get('job_id', 'job_id')}`\n"
-                message += "⚠️ **Warning:** Deleted posts cannot be recovered!"
+                parts.append(f"\n⚠️ **To delete:** Say `delete {drafts[0].get('job_id', 'job_id')}`\n")
+                parts.append("⚠️ **Warning:** Deleted posts cannot be recovered!")
+                message = "".join(parts)
                 
             else:
                 message = f"📭 **No Job Postings Found**\n\n" \
@@ -578,45 +655,48 @@ def handle_past_request(response_dict, user_data, slack_handler):
         
         elif request_type == 'list':
             # Show comprehensive list with statistics - USE SUMMARY FORMAT
-            drafts = get_user_drafts(user_id, limit=20)
+            drafts = get_user_drafts_summary(user_id, limit=20)
             edit_requests = get_user_edit_requests(user_id, limit=5)
             
             # Calculate statistics
-            total_jobs = len(drafts)
-            recent_jobs = len([d for d in drafts if d.get('timestamp', '') > (datetime.now() - timedelta(days=30)).isoformat()])
+            total_jobs, recent_jobs = get_draft_stats(user_id)
             
-            message = f"📊 **Your Job Posting Summary**\n\n"
-            message += f"📈 **Statistics:**\n"
-            message += f"• Total job postings: {total_jobs}\n"
-            message += f"• Recent (last 30 days): {recent_jobs}\n"
-            message += f"• Pending edits: {len(edit_requests)}\n\n"
+            parts = [
+                "📊 **Your Job Posting Summary**\n\n",
+                "📈 **Statistics:**\n",
+                f"• Total job postings: {total_jobs}\n",
+                f"• Recent (last 30 days): {recent_jobs}\n",
+                f"• Pending edits: {len(edit_requests)}\n\n",
+            ]
             
             if drafts:
-                message += f"📋 **Recent Job Postings:**\n"
-                for draft in drafts[:10]:  # Show more in list view
-                    message += format_draft_summary(draft) + "\n"
+                parts.append("📋 **Recent Job Postings:**\n")
+                parts.extend(format_draft_summary(draft) + "\n" for draft in drafts[:10])  # Show more in list view
                 
                 if len(drafts) > 10:
-                    message += f"• ... and {len(drafts) - 10} more\n"
+                    parts.append(f"• ... and {len(drafts) - 10} more\n")
             
-            message += f"\n💡 **Quick Actions:**\n"
-            message += f"• `show job_id` - View full details\n"
-            # message += f"• `edit job_id` - Modify a posting\n"
-            message += f"• `delete job_id` - Remove a posting"
+            parts.append("\n💡 **Quick Actions:**\n")
+            parts.append("• `show job_id` - View full details\n")
+            # parts.append("• `edit job_id` - Modify a posting\n")
+            parts.append("• `delete job_id` - Remove a posting")
+            message = "".join(parts)
         
         else:
             # General past request help
-            drafts_count = len(get_user_drafts(user_id, limit=1))
+            drafts_count = len(get_user_drafts_summary(user_id, limit=1))
             
-            message = f"🤔 **Past Requests Help**\n\n"
-            message += f"Hi {username}! You currently have {drafts_count} job posting(s).\n\n"
-            message += f"🎯 **What I can help you with:**\n"
-            message += f"• 👀 **View** - `show my posts`\n"
-            message += f"• 📄 **Details** - `show job_123`\n"
-            # message += f"• ✏️ **Edit** - `edit job_123`\n" 
-            message += f"• 🗑️ **Delete** - `delete job_123`\n"
-            message += f"• 📋 **List** - `list all jobs`\n\n"
-            message += f"Just tell me what you'd like to do!"
+            message = "".join([
+                "🤔 **Past Requests Help**\n\n",
+                f"Hi {username}! You currently have {drafts_count} job posting(s).\n\n",
+                "🎯 **What I can help you with:**\n",
+                "• 👀 **View** - `show my posts`\n",
+                "• 📄 **Details** - `show job_123`\n",
+                # "• ✏️ **Edit** - `edit job_123`\n",
+                "• 🗑️ **Delete** - `delete job_123`\n",
+                "• 📋 **List** - `list all jobs`\n\n",
+                "Just tell me what you'd like to do!",
+            ])
         
         # Post message to Slack
         slack_handler._post_response(
@@ -625,11 +705,10 @@ def handle_past_request(response_dict, user_data, slack_handler):
             text=message
         )
         
-        print(f"✅ Posted enhanced response to Slack for {username}")
+        logger.debug("✅ Posted enhanced response to Slack for %s", username)
         
-    except Exception as e:
-        print(f"❌ Error in enhanced past request handling: {e}")
-        logger.error(f"Enhanced past request error: {e}")
+    except Exception:
+        logger.exception("❌ Error in enhanced past request handling")
         
         # Fallback message
         try:
@@ -641,30 +720,97 @@ def handle_past_request(response_dict, user_data, slack_handler):
                 thread_ts=user_data.get('thread_ts'),
                 text=fallback_msg
             )
-        except Exception as fallback_error:
-            print(f"❌ Even fallback message failed: {fallback_error}")
+        except Exception:
+            logger.exception("❌ Even fallback message failed")
+
+# Fixed company details added to every hiring request, and the user fields copied onto it
+_DEFAULT_COMPANY_ENTITIES = {
+    'company': 'whisprnet.ai',
+    'url': 'http://linkedin.com',
+    'city': 'pondicherry',
+    'state': 'pondicherry',
+    'mail': 'careers@whisprnet.ai',
+    'education': 'btech/mtech'
+}
+_USER_METADATA_KEYS = ('user_id', 'username', 'app_id', 'channel_id')
+
+# Markdown code fences the model sometimes wraps its JSON answer in
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.M)
+
+class _JsonObjectScanner:
+    """Incrementally finds where the first top-level {...} object in a piece-by-piece text ends"""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = self.escaped = False
+
+    def feed(self, text):
+        """Scan the next piece of text; return the index just past the object's closing brace, or -1"""
+        for i, c in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif c == '\\':
+                    self.escaped = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '{':
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                # Prose before the object, quotes included, is skipped
+                continue
+            elif c == '"':
+                self.in_string = True
+            elif c == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+def _extract_json(text):
+    """Parse the LLM's JSON answer, tolerating code fences and prose around the first {...} object"""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    
+    stripped = _JSON_FENCE_RE.sub('', text)
+    start = stripped.find('{')
+    if start >= 0:
+        end = _JsonObjectScanner().feed(stripped[start:])
+        if end >= 0:
+            return orjson.loads(stripped[start:start + end])
+    
+    # No balanced object found; re-raise the original decode error
+    return orjson.loads(text)
+
+def _log_post_error(future):
+    """Done-callback for background Slack posts"""
+    exc = future.exception()
+    if exc is not None:
+        logger.error("❌ Error posting response to Slack: %s", exc)
+
+def _post_response_async(slack_handler, **kwargs):
+    """Submit slack_handler._post_response to the Slack worker pool without waiting for it"""
+    future = _SLACK_EXECUTOR.submit(slack_handler._post_response, **kwargs)
+    future.add_done_callback(_log_post_error)
+    return future
 
 def handle_hiring_request(response_dict, user_data, slack_handler):
     """Handle new hiring request (existing logic with enhancements)"""
-    print(f"💼 HIRING REQUEST detected for user: {user_data.get('username')}")
+    logger.debug("💼 HIRING REQUEST detected for user: %s", user_data.get('username'))
     
     try:
         # Add company details (existing logic)
-        response_dict['entities']['company'] = 'whisprnet.ai'
-        response_dict['entities']['url'] = 'http://linkedin.com'
-        response_dict['entities']['city'] = 'pondicherry'
-        response_dict['entities']['state'] = 'pondicherry'
-        response_dict['entities']['mail'] = 'careers@whisprnet.ai'
-        response_dict['entities']['education'] = 'btech/mtech'
+        response_dict['entities'].update(_DEFAULT_COMPANY_ENTITIES)
         
         # Add user metadata
-        response_dict["user_id"] = user_data["user_id"]
-        response_dict["username"] = user_data["username"]
-        response_dict["app_id"] = user_data["app_id"]
-        response_dict["channel_id"] = user_data["channel_id"]
+        response_dict.update({key: user_data[key] for key in _USER_METADATA_KEYS})
         response_dict["session_id"] = user_data.get("session_id", "default")
         
-        print(f"📤 Sending to job posting system for {user_data.get('username')}")
+        logger.debug("📤 Sending to job posting system for %s", user_data.get('username'))
         
         # Send to job posting system
         naveen(response_dict)
@@ -672,22 +818,23 @@ def handle_hiring_request(response_dict, user_data, slack_handler):
         # Send confirmation to Slack
         if slack_handler and user_data.get('channel_id'):
             confirmation_msg = f"✅ Got it {user_data.get('username')}! I'm processing your job posting request..."
-            slack_handler._post_response(
+            _post_response_async(
+                slack_handler,
                 channel_id=user_data['channel_id'],
                 thread_ts=user_data.get('thread_ts'),
                 text=confirmation_msg
             )
         
-        print(f"✅ Hiring request processed successfully for {user_data.get('username')}")
+        logger.debug("✅ Hiring request processed successfully for %s", user_data.get('username'))
         
     except Exception as e:
-        print(f"❌ Error processing hiring request: {e}")
-        logger.error(f"Hiring request processing error: {e}")
+        logger.error("❌ Error processing hiring request: %s", e)
         
         # Send error message to user
         if slack_handler and user_data.get('channel_id'):
             error_msg = f"Sorry {user_data.get('username', '')}, I encountered an issue processing your job posting. Please try again!"
-            slack_handler._post_response(
+            _post_response_async(
+                slack_handler,
                 channel_id=user_data['channel_id'],
                 thread_ts=user_data.get('thread_ts'),
                 text=error_msg
@@ -696,7 +843,7 @@ def handle_hiring_request(response_dict, user_data, slack_handler):
 def handle_non_hiring_request(response_dict, user_data, slack_handler):
     """Handle non-hiring requests - general questions, support, etc."""
     username = user_data.get('username', 'there')
-    print(f"ℹ️ NON-HIRING request from {username}")
+    logger.debug("ℹ️ NON-HIRING request from %s", username)
     
     # Send a helpful response for non-hiring requests
     if slack_handler and user_data.get('channel_id'):
@@ -708,19 +855,21 @@ def handle_non_hiring_request(response_dict, user_data, slack_handler):
                       "• 🗑️ Delete old postings\n" \
                       "How can I assist you with your hiring needs?"
             
-            slack_handler._post_response(
+            _post_response_async(
+                slack_handler,
                 channel_id=user_data['channel_id'],
                 thread_ts=user_data.get('thread_ts'),
                 text=help_msg
             )
             
-            print(f"✅ Sent help message to {username}")
+            logger.debug("✅ Queued help message for %s", username)
             
         except Exception as e:
-            print(f"❌ Error sending help message: {e}")
+            logger.error("❌ Error sending help message: %s", e)
 
 def intent_entity_processor(data, slack_handler=None): 
     """Enhanced intent entity processor that handles hiring requests, past requests, and non-hiring intents"""
+    pending = []
     for list_item in data:
         message = list_item['response']
         original_message = list_item.get('text', message)  # Get original message if available
@@ -729,74 +878,72 @@ def intent_entity_processor(data, slack_handler=None):
         # First check for specific job actions (edit job_123, delete job_456, show job_789)
         # Use original message for pattern matching, not the processed response
         if slack_handler and (is_specific_job_action or handle_specific_job_action(original_message, list_item, slack_handler)):
-            print(f"✅ Handled specific job action for: {original_message}")
+            logger.debug("✅ Handled specific job action for: %s", original_message)
             continue
         
-        print(f"\nProcessing user: {list_item.get('username', 'Unknown')}")
-        print(f"Message: {message}")
+        # Small talk and near-empty messages are always non-hiring; skip the LLM for them
+        if len(message.strip()) < _TRIVIAL_MIN_LEN or _GREETING_RE.match(message):
+            handle_non_hiring_request({"intent": "non_hiring", "entities": {}}, list_item, slack_handler)
+            continue
+        pending.append(list_item)
+    
+    # Extract intents for all remaining messages in one LLM call when there are several
+    messages = [item['response'] for item in pending]
+    responses = intent_entity_extractor_batch(messages) if len(messages) > 1 else None
+    if responses is None:
+        # One call per message, run concurrently; results come back in message order
+        responses = list(_INTENT_EXEC.map(intent_entity_extractor, messages))
+    
+    for i, list_item in enumerate(pending):
+        message = list_item['response']
+        logger.debug("Processing user: %s", list_item.get('username', 'Unknown'))
+        logger.debug("Message: %s", message)
         
-        intent_entity_response = intent_entity_extractor(message)
-        print(f"Raw intent extraction: {intent_entity_response}")
+        intent_entity_response = responses[i]
+        logger.debug("Raw intent extraction: %s", intent_entity_response)
         
         try:
-            # Ensure intent_entity_response is a string before parsing
-            if isinstance(intent_entity_response, list):
-                intent_entity_response = intent_entity_response[0] if intent_entity_response else "{}"
-            elif isinstance(intent_entity_response, dict):
-                intent_entity_response = json.dumps(intent_entity_response)
-            elif not isinstance(intent_entity_response, str):
-                intent_entity_response = str(intent_entity_response)
-            
-            response_dict = json.loads(intent_entity_response)
-            print(f"Parsed entities: {response_dict.get('entities', {})}")
+            response_dict = _extract_json(intent_entity_response)
+            logger.debug("Parsed entities: %s", response_dict.get('entities', {}))
             
             intent = response_dict.get('intent', 'non_hiring')
-            print(f"Detected intent: {intent}")
+            logger.debug("Detected intent: %s", intent)
             
             if intent == 'past_request':
-                print("🔄 Routing to database-powered past request handler...")
+                logger.debug("🔄 Routing to database-powered past request handler...")
                 handle_past_request(response_dict, list_item, slack_handler)
                 
             elif intent == 'hiring_request':
-                print("💼 Routing to hiring request handler...")
-                print(f"Response dict: {response_dict}")
+                logger.debug("💼 Routing to hiring request handler...")
+                logger.debug("Response dict: %s", response_dict)
                 handle_hiring_request(response_dict, list_item, slack_handler)
                 
             else:
-                print(f"ℹ️ Non-hiring intent detected for user {list_item.get('username')}")
+                logger.debug("ℹ️ Non-hiring intent detected for user %s", list_item.get('username'))
                 handle_non_hiring_request(response_dict, list_item, slack_handler)
                 
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse intent extraction JSON: {e}")
-            print(f"Raw response: {intent_entity_response}")
+        except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
+            logger.error("❌ Failed to parse intent extraction JSON: %s", e)
+            logger.debug("Raw response: %s", intent_entity_response)
             
             if slack_handler and list_item.get('channel_id'):
-                slack_handler._post_response(
+                _post_response_async(
+                    slack_handler,
                     channel_id=list_item['channel_id'],
                     thread_ts=None,
                     text=f"Sorry {list_item.get('username', '')}, I had trouble understanding your request. Could you please rephrase it?"
                 )
                 
         except Exception as e:
-            print(f"❌ Error in intent processing: {e}")
-            logger.error(f"Intent processing error: {e}")
-    
-    print("="*80)
-    print("INTENT ENTITY PROCESSOR - Completed")
-    print("="*80)
-
-def intent_entity_extractor(message) -> str:
-    """Extract intent and entities from user message using enhanced prompt with job normalization"""
-    print("🔍 Processing intent entity extraction...")
-    print(f"Input message: {message}")
-    print("####")
+            logger.error("❌ Error in intent processing: %s", e)
     
-    # Enhanced prompt template with job normalization and past_request detection
-    prompt = ChatPromptTemplate.from_template("""
-    CONVERSATION:
-    {message_batch}
+    logger.debug("INTENT ENTITY PROCESSOR - Completed")
 
-    TASK: Analyze the conversation and extract the following information in JSON format with intelligent job normalization:
+# Enhanced prompt template with job normalization and past_request detection, parsed once.
+# The static instructions come first and the message last, so the shared prefix is
+# identical across requests and can be reused by provider-side prompt caching.
+_INTENT_INSTRUCTIONS = """
+    TASK: Analyze the conversation at the end of this prompt and extract the following information in JSON format with intelligent job normalization:
 
     {{
      "intent": "hiring_request" | "past_request" | "non_hiring",
@@ -913,37 +1060,288 @@ def intent_entity_extractor(message) -> str:
     - Return ONLY the JSON object, no markdown formatting
     - Do NOT wrap the response in json or  tags
                                               
+"""
+_INTENT_PROMPT = ChatPromptTemplate.from_template(_INTENT_INSTRUCTIONS + """
+    CONVERSATION:
+    {message_batch}
+
     RESPONSE: Return only valid JSON, no additional text:
     """)
+# Batch variant: several independent messages in one call, answered as a JSON array
+_INTENT_BATCH_PROMPT = ChatPromptTemplate.from_template(_INTENT_INSTRUCTIONS + """
+    BATCH MODE:
+    - The conversation below is a numbered list of SEPARATE messages, possibly from different users
+    - Analyze each message independently, as if it were the only one
+    - Return a JSON array with exactly one object of the format above per message, in the same order
+
+    CONVERSATION:
+    {message_batch}
+
+    RESPONSE: Return only a valid JSON array, no additional text:
+    """)
 
-    # Setup NVIDIA LLM
-    formatter_llm = ChatNVIDIA(
-        model="meta/llama3-70b-instruct",
+# ChatNVIDIA's client opens a new requests.Session for every call (no keep-alive); hand it one
+# pooled session instead so the TCP/TLS connection to the NVIDIA endpoint is reused.
+# This patches the private _client.get_session_fn of langchain-nvidia-ai-endpoints 0.3.10
+# (pinned in requirements.txt) and is skipped if a later version drops that hook. The one
+# session is shared by every _INTENT_EXEC worker: the client only issues get/post on it and
+# never mutates its headers, cookies or auth, and urllib3's connection pool is thread-safe,
+# so pool_maxsize covers the worker count
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+
+@lru_cache(maxsize=4)
+def _get_intent_llm(model_name):
+    """Return a shared ChatNVIDIA client per model so its HTTP session is reused"""
+    llm = ChatNVIDIA(
+        model=model_name,
         api_key=os.getenv("NVIDIA_API_KEY")
     )
+    client = getattr(llm, "_client", None)
+    if client is not None and hasattr(client, "get_session_fn"):
+        client.get_session_fn = lambda: _HTTP_SESSION
+    return llm
+
+class _SemanticCache:
+    """Nearest-neighbour cache of intent responses keyed by message embedding.
+
+    Embeddings come from chromadb's bundled ONNX all-MiniLM-L6-v2 model (local CPU),
+    are L2-normalized, and searched with a dot product, so similarity is cosine.
+    """
+
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._embed_fn = None
+        self._vectors = None  # (n, dim) float32 matrix of stored embeddings
+        self._responses = []
+        self._dirty = False
+
+    def _embed(self, message):
+        import numpy as np
+        if self._embed_fn is None:
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+            self._embed_fn = DefaultEmbeddingFunction()
+        vector = np.asarray(self._embed_fn([message])[0], dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, message):
+        """Return (embedding, cached response or None) for a message"""
+        vector = self._embed(message)
+        with self._lock:
+            if self._vectors is None:
+                return vector, None
+            scores = self._vectors @ vector
+            best = int(scores.argmax())
+            if scores[best] > self.threshold:
+                return vector, self._responses[best]
+        return vector, None
+
+    def add(self, vector, response):
+        import numpy as np
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = vector[None, :]
+            else:
+                self._vectors = np.vstack([self._vectors, vector])
+            self._responses.append(response)
+            # Drop the oldest entries once full
+            if len(self._responses) > self.max_entries:
+                self._vectors = self._vectors[-self.max_entries:]
+                self._responses = self._responses[-self.max_entries:]
+            self._dirty = True
+
+    def load(self, path):
+        """Load entries saved by save(); the embedding matrix is memory-mapped, not read up front"""
+        import numpy as np
+        vectors_path, responses_path = f"{path}.npy", f"{path}.json"
+        if not (os.path.exists(vectors_path) and os.path.exists(responses_path)):
+            return
+        with open(responses_path, 'rb') as f:
+            responses = orjson.loads(f.read())
+        vectors = np.load(vectors_path, mmap_mode='r')
+        if len(vectors) != len(responses):
+            logger.warning("Semantic cache files at %s are out of sync, ignoring them", path)
+            return
+        with self._lock:
+            self._vectors = vectors if len(responses) else None
+            self._responses = responses
+            self._dirty = False
+        logger.info("Loaded %d semantic cache entries from %s", len(responses), path)
+
+    def save(self, path):
+        """Write entries to <path>.npy / <path>.json if they changed since the last load or save"""
+        import numpy as np
+        with self._lock:
+            if not self._dirty or self._vectors is None:
+                return
+            vectors, responses = np.array(self._vectors), list(self._responses)
+            self._dirty = False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # np.save appends .npy itself, so hand it an open file to control the temp name
+        with open(f"{path}.npy.tmp", 'wb') as f:
+            np.save(f, vectors)
+        with open(f"{path}.json.tmp", 'wb') as f:
+            f.write(orjson.dumps(responses))
+        os.replace(f"{path}.npy.tmp", f"{path}.npy")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+# Semantic cache for phrasing variants of the same request. Opt-in: a near-identical message
+# can still differ in entities (e.g. "3 years" vs "5 years"), so it trades accuracy for latency.
+SEMANTIC_CACHE_ENABLED = os.getenv("INTENT_SEMANTIC_CACHE", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("INTENT_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+_semantic_cache = _SemanticCache(SEMANTIC_CACHE_THRESHOLD, max_entries=1024)
+
+# Both caches can be persisted next to the drafts database so a restarted worker reuses past
+# answers. Opt-in: the persisted keys are users' raw Slack messages, kept for INTENT_CACHE_TTL_SECONDS
+CACHE_DIR = os.path.dirname(DB_FILE)
+INTENT_CACHE_DB = os.path.join(CACHE_DIR, 'intent_cache.db')
+SEMANTIC_CACHE_PATH = os.path.join(CACHE_DIR, 'intent_semantic_cache')
+INTENT_CACHE_PERSIST = os.getenv("INTENT_CACHE_PERSIST", "false").lower() == "true"
+INTENT_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+def _cache_conn():
+    """Return this thread's connection to INTENT_CACHE_DB, creating the table on first use"""
+    conn = getattr(_tls, 'cache_conn', None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(INTENT_CACHE_DB, check_same_thread=False, isolation_level=None)
+        for pragma in _PRAGMAS:
+            conn.execute(f'PRAGMA {pragma}')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS intent_cache (
+                model TEXT NOT NULL,
+                message TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, message)
+            )
+        """)
+        _tls.cache_conn = conn
+    return conn
 
+def _disk_cache_get(model_name, message):
+    """Persisted response for (model, message) if younger than INTENT_CACHE_TTL_SECONDS, else None"""
     try:
-        # Format the prompt
-        formatted_prompt = prompt.format_messages(message_batch=message)
+        row = _cache_conn().execute(
+            "SELECT response FROM intent_cache WHERE model = ? AND message = ? AND created_at > ?",
+            (model_name, message, time.time() - INTENT_CACHE_TTL_SECONDS)
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Intent cache read failed: {e}")
+        return None
+    return row[0] if row else None
 
-        # Invoke the model
-        response = formatter_llm.invoke(formatted_prompt)
+def _disk_cache_set(model_name, message, response):
+    """Persist a response for (model, message), replacing any older one"""
+    try:
+        _cache_conn().execute(
+            "INSERT OR REPLACE INTO intent_cache (model, message, response, created_at) VALUES (?, ?, ?, ?)",
+            (model_name, message, response, time.time())
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Intent cache write failed: {e}")
+
+if SEMANTIC_CACHE_ENABLED and INTENT_CACHE_PERSIST:
+    try:
+        _semantic_cache.load(SEMANTIC_CACHE_PATH)
+    except Exception as e:
+        logger.warning(f"Could not load semantic cache: {e}")
+    atexit.register(_semantic_cache.save, SEMANTIC_CACHE_PATH)
 
-        # Print just the content
-        print("🤖 LLM Response:")
-        print(response.content)
+# LLM message content may come back as a string, a list of parts or a dict; always hand out a string
+_COERCE_BY_TYPE = {
+    str: lambda value: value,
+    list: lambda value: str(value[0]) if value else "{}",
+    dict: lambda value: orjson.dumps(value).decode(),
+}
+
+def _coerce_to_str(value):
+    """Normalize an LLM content payload to the string intent_entity_extractor returns"""
+    coerce = _COERCE_BY_TYPE.get(type(value))
+    return coerce(value) if coerce else str(value)
+
+def _stream_json_response(llm, prompt):
+    """Stream the model's answer, stop reading once the first JSON object closes and return the text so far"""
+    scanner = _JsonObjectScanner()
+    parts = []
+    for chunk in llm.stream(prompt):
+        piece = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+        end = scanner.feed(piece)
+        if end >= 0:
+            parts.append(piece[:end])
+            break
+        parts.append(piece)
+    return "".join(parts)
+
+def _is_intent_json(content):
+    """True if content parses (via _extract_json) to a JSON object"""
+    try:
+        return isinstance(_extract_json(content), dict)
+    except ValueError:
+        return False
+
+@lru_cache(maxsize=1024)
+def _cached_llm_invoke(model_name: str, message: str) -> str:
+    """Run the intent extraction prompt for one message, cached per (model, message); errors are not cached"""
+    if INTENT_CACHE_PERSIST:
+        cached = _disk_cache_get(model_name, message)
+        if cached is not None and _is_intent_json(cached):
+            return cached
+    
+    # Format the prompt
+    formatted_prompt = _INTENT_PROMPT.format_messages(message_batch=message)
+
+    # Stream the answer so we can stop as soon as the JSON object is complete; the model
+    # often keeps emitting whitespace or a closing fence after it
+    llm = _get_intent_llm(model_name)
+    try:
+        content = _stream_json_response(llm, formatted_prompt)
+    except Exception as e:
+        logger.warning(f"Streaming intent extraction failed, retrying without streaming: {e}")
+        content = ""
+    if not _is_intent_json(content):
+        # Nothing streamed, or the stream stopped at a brace that wasn't the answer; ensure we return a string
+        content = _coerce_to_str(llm.invoke(formatted_prompt).content)
+
+    # Print just the content
+    logger.debug("🤖 LLM Response: %s", content)
+    
+    # Raising keeps unusable answers out of lru_cache (and the disk cache), so a retry asks again
+    if not _is_intent_json(content):
+        raise ValueError(f"LLM returned no usable intent JSON: {content[:200]!r}")
+    
+    if INTENT_CACHE_PERSIST:
+        _disk_cache_set(model_name, message, content)
+    return content
+
+def intent_entity_extractor(message) -> str:
+    """Extract intent and entities from user message using enhanced prompt with job normalization"""
+    logger.debug("🔍 Processing intent entity extraction for message: %s", message)
+    
+    try:
+        # Collapse whitespace so trivially different repeats share a cache entry; case is
+        # kept because it carries entity information (skills, titles)
+        normalized = " ".join(str(message).split())
+        if not SEMANTIC_CACHE_ENABLED:
+            return _cached_llm_invoke(INTENT_MODEL, normalized)
         
-        # Ensure we return a string
-        content = response.content
-        if isinstance(content, list):
-            content = content[0] if content else "{}"
-        elif isinstance(content, dict):
-            content = json.dumps(content)
-        return str(content)
+        try:
+            vector, cached = _semantic_cache.lookup(normalized)
+        except Exception as e:
+            # Embedding model unavailable; fall back to the exact-match cache only
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return _cached_llm_invoke(INTENT_MODEL, normalized)
+        if cached is not None:
+            logger.debug("♻️ Semantic cache hit")
+            return cached
+        response = _cached_llm_invoke(INTENT_MODEL, normalized)
+        _semantic_cache.add(vector, response)
+        return response
         
     except Exception as e:
-        print(f"❌ Error in LLM processing: {e}")
-        logger.error(f"LLM processing error: {e}")
+        logger.error("❌ Error in LLM processing: %s", e)
         
         # Return fallback response
         fallback_response = {
@@ -959,7 +1357,26 @@ def intent_entity_extractor(message) -> str:
                 "request_type": None
             }
         }
-        return json.dumps(fallback_response)
+        return orjson.dumps(fallback_response).decode()
+
+def intent_entity_extractor_batch(messages):
+    """Extract intents for several messages in one LLM call; returns one JSON string per message, or None to fall back"""
+    numbered = "\n".join(f"{i}. {' '.join(str(m).split())}" for i, m in enumerate(messages, 1))
+    logger.debug("🔍 Processing batched intent extraction for %d messages...", len(messages))
+    
+    try:
+        formatted_prompt = _INTENT_BATCH_PROMPT.format_messages(message_batch=numbered)
+        content = _get_intent_llm(INTENT_MODEL).invoke(formatted_prompt).content
+        results = orjson.loads(content) if isinstance(content, str) else content
+        
+        if not isinstance(results, list) or len(results) != len(messages) or not all(isinstance(r, dict) for r in results):
+            logger.warning("⚠️ Batched intent response did not match the message list, falling back to per-message extraction")
+            return None
+        return [orjson.dumps(r).decode() for r in results]
+        
+    except Exception as e:
+        logger.warning("⚠️ Batched intent extraction failed, falling back to per-message extraction: %s", e)
+        return None
 
 # Integration function for SlackHandler
 def integrate_with_slack_handler():
@@ -1077,14 +1494,6 @@ def test_intent_extraction():
         print(f"\nTest {i}: '{message}'")
         result = intent_entity_extractor(message)
         try:
-            # Ensure result is a string before parsing
-            if isinstance(result, list):
-                result = result[0] if result else "{}"
-            elif isinstance(result, dict):
-                result = json.dumps(result)
-            elif not isinstance(result, str):
-                result = str(result)
-            
             parsed = json.loads(result)
             print(f"Intent: {parsed.get('intent')}")
             print(f"Request Type: {parsed.get('entities', {}).get('request_type')}")
@@ -1114,21 +1523,11 @@ def test_specific_job_actions():
     for test_message in test_cases:
         print(f"\nTesting: '{test_message}'")
         
-        # Test pattern matching
-        edit_pattern = r'edit[\s_]+(job_)?([a-zA-Z0-9_]{4,})'
-        delete_pattern = r'delete[\s_]+(job_)?([a-zA-Z0-9_]{4,})'
-        show_pattern = r'show[\s_]+(job_)?([a-zA-Z0-9_]{4,})'
+        # Test pattern matching with the same regex handle_specific_job_action uses
+        match = _ACTION_RE.search(test_message.lower())
         
-        edit_match = re.search(edit_pattern, test_message.lower())
-        delete_match = re.search(delete_pattern, test_message.lower())
-        show_match = re.search(show_pattern, test_message.lower())
-        
-        if edit_match:
-            print(f"✅ Edit match: {edit_match.group(2)}")
-        elif delete_match:
-            print(f"✅ Delete match: {delete_match.group(2)}")
-        elif show_match:
-            print(f"✅ Show match: {show_match.group(2)}")
+        if match:
+            print(f"✅ {match.group('op').title()} match: {match.group('id')}")
         else:
             print("❌ No specific job action match")
     
@@ -1172,81 +1571,64 @@ def test_formatting_functions():
     print("\nFormatting tests completed")
 
 # Command pattern matching functions
+_CMD_RE = re.compile(r'\b(?:edit|delete|show|view|update|remove)\s+([a-zA-Z0-9_]+)')
+_CMD_WORD_RE = re.compile(r'\b(edit|delete|remove|show|view|display|list|all)\b')
+_COMMAND_TYPES = {
+    'edit': 'edit',
+    'delete': 'delete', 'remove': 'delete',
+    'show': 'show', 'view': 'show', 'display': 'show',
+    'list': 'list', 'all': 'list',
+}
+_COMMAND_PRIORITY = ('edit', 'delete', 'show', 'list')
+
 def extract_job_id_from_command(message):
     """Extract job ID from various command patterns"""
-    patterns = [
-        r'edit\s+([a-zA-Z0-9_]+)',
-        r'delete\s+([a-zA-Z0-9_]+)',
-        r'show\s+([a-zA-Z0-9_]+)',
-        r'view\s+([a-zA-Z0-9_]+)',
-        r'update\s+([a-zA-Z0-9_]+)',
-        r'remove\s+([a-zA-Z0-9_]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, message.lower())
-        if match:
-            return match.group(1)
-    
-    return None
+    match = _CMD_RE.search(message.lower())
+    return match.group(1) if match else None
 
 def get_command_type(message):
     """Determine the command type from message"""
-    message_lower = message.lower()
-    
-    if re.search(r'\bedit\b', message_lower):
-        return 'edit'
-    elif re.search(r'\bdelete\b|\bremove\b', message_lower):
-        return 'delete'
-    elif re.search(r'\bshow\b|\bview\b|\bdisplay\b', message_lower):
-        return 'show'
-    elif re.search(r'\blist\b|\ball\b', message_lower):
-        return 'list'
-    
-    return None
+    found = {_COMMAND_TYPES[word] for word in _CMD_WORD_RE.findall(message.lower())}
+    return next((command for command in _COMMAND_PRIORITY if command in found), None)
 
 # Statistics and analytics functions
 def get_user_job_statistics(user_id):
     """Get comprehensive job posting statistics for a user"""
     try:
-        drafts = get_user_drafts(user_id, limit=1000)  # Get all drafts
+        drafts = _drafts_cached(user_id, limit=1000)  # Get all drafts
         edit_requests = get_user_edit_requests(user_id, limit=100)
         
         # Basic counts
         total_jobs = len(drafts)
         total_edits = len(edit_requests)
         
-        # Time-based analysis
+        # Time-based cutoffs, computed once; stored timestamps are ISO strings and compare as such
         now = datetime.now()
-        recent_jobs = len([d for d in drafts if d.get('timestamp', '') > (now - timedelta(days=30)).isoformat()])
-        this_week = len([d for d in drafts if d.get('timestamp', '') > (now - timedelta(days=7)).isoformat()])
+        cutoff_30 = (now - timedelta(days=30)).isoformat()
+        cutoff_7 = (now - timedelta(days=7)).isoformat()
         
-        # Job type analysis
-        job_types = {}
-        locations = {}
-        companies = {}
+        # Time, job type, location and company analysis in a single pass
+        recent_jobs = this_week = 0
+        job_types, locations, companies = Counter(), Counter(), Counter()
         
         for draft in drafts:
-            # Count job types
-            job_type = draft.get('job_type', 'Unknown')
-            job_types[job_type] = job_types.get(job_type, 0) + 1
-            
-            # Count locations
-            location = draft.get('location', 'Unknown')
-            locations[location] = locations.get(location, 0) + 1
-            
-            # Count companies
-            company = draft.get('company', 'Unknown')
-            companies[company] = companies.get(company, 0) + 1
+            timestamp = draft.get('timestamp', '')
+            if timestamp > cutoff_30:
+                recent_jobs += 1
+                if timestamp > cutoff_7:
+                    this_week += 1
+            job_types[draft.get('job_type', 'Unknown')] += 1
+            locations[draft.get('location', 'Unknown')] += 1
+            companies[draft.get('company', 'Unknown')] += 1
         
         return {
             'total_jobs': total_jobs,
             'total_edits': total_edits,
             'recent_jobs_30_days': recent_jobs,
             'jobs_this_week': this_week,
-            'most_common_job_types': sorted(job_types.items(), key=lambda x: x[1], reverse=True)[:5],
-            'most_common_locations': sorted(locations.items(), key=lambda x: x[1], reverse=True)[:5],
-            'most_common_companies': sorted(companies.items(), key=lambda x: x[1], reverse=True)[:5]
+            'most_common_job_types': job_types.most_common(5),
+            'most_common_locations': locations.most_common(5),
+            'most_common_companies': companies.most_common(5)
         }
     
     except Exception as e:
@@ -1254,57 +1636,88 @@ def get_user_job_statistics(user_id):
         return {}
 
 # Advanced search functions
+_TOKEN_RE = re.compile(r'\w+')
+_search_index_cache = TTLCache(maxsize=256, ttl=DRAFTS_CACHE_TTL_SECONDS)
+
+def _get_search_index(user_id):
+    """Return (drafts, searchable texts, token -> draft positions) for a user, cached with the drafts TTL"""
+    with _drafts_cache_lock:
+        entry = _search_index_cache.get(user_id)
+    if entry is None:
+        drafts = _drafts_cached(user_id, limit=1000)
+        texts = [
+            f"{draft.get('job_title', '')} {draft.get('company', '')} {draft.get('skills', '')} {draft.get('location', '')}".lower()
+            for draft in drafts
+        ]
+        index = defaultdict(set)
+        for i, text in enumerate(texts):
+            for token in _TOKEN_RE.findall(text):
+                index[token].add(i)
+        entry = (drafts, texts, index)
+        with _drafts_cache_lock:
+            _search_index_cache[user_id] = entry
+    return entry
+
 def search_user_jobs(user_id, search_query, limit=10):
     """Search user's jobs by title, skills, or company"""
     try:
-        all_drafts = get_user_drafts(user_id, limit=1000)
+        drafts, texts, index = _get_search_index(user_id)
         search_terms = search_query.lower().split()
         
-        matching_jobs = []
-        
-        for draft in all_drafts:
-            # Create searchable text from job details
-            searchable_text = f"{draft.get('job_title', '')} {draft.get('company', '')} {draft.get('skills', '')} {draft.get('location', '')}".lower()
-            
-            # Check if any search term matches
-            if any(term in searchable_text for term in search_terms):
-                matching_jobs.append(draft)
+        # A draft matches if any term occurs in its searchable text. Word terms are resolved
+        # against the token vocabulary (substring of a token, as before); terms with
+        # punctuation such as "node.js" can span tokens, so those scan the texts directly.
+        matched = set()
+        for term in search_terms:
+            if _TOKEN_RE.fullmatch(term):
+                for token, positions in index.items():
+                    if term in token:
+                        matched |= positions
+            else:
+                matched.update(i for i, text in enumerate(texts) if term in text)
         
-        return matching_jobs[:limit]
+        return [drafts[i] for i in sorted(matched)][:limit]
     
     except Exception as e:
         logger.error(f"Error searching user jobs: {e}")
         return []
 
 # Export functions
+_SEP_80 = "=" * 80
+_SEP_40 = "-" * 40
+
 def export_user_jobs_to_text(user_id):
     """Export all user jobs to a formatted text string"""
     try:
-        drafts = get_user_drafts(user_id, limit=1000)
+        drafts = _drafts_cached(user_id, limit=1000)
         
         if not drafts:
             return "No job postings found for export."
         
-        export_text = f"JOB POSTINGS EXPORT\n"
-        export_text += f"User ID: {user_id}\n"
-        export_text += f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        export_text += f"Total Jobs: {len(drafts)}\n"
-        export_text += "="*80 + "\n\n"
+        parts = [
+            "JOB POSTINGS EXPORT\n",
+            f"User ID: {user_id}\n",
+            f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Total Jobs: {len(drafts)}\n",
+            _SEP_80 + "\n\n",
+        ]
         
         for i, draft in enumerate(drafts, 1):
-            export_text += f"JOB #{i}\n"
-            export_text += f"ID: {draft.get('job_id', 'N/A')}\n"
-            export_text += f"Title: {draft.get('job_title', 'N/A')}\n"
-            export_text += f"Company: {draft.get('company', 'N/A')}\n"
-            export_text += f"Type: {draft.get('job_type', 'N/A')}\n"
-            export_text += f"Experience: {draft.get('experience', 'N/A')}\n"
-            export_text += f"Location: {draft.get('location', 'N/A')}\n"
-            export_text += f"Skills: {draft.get('skills', 'N/A')}\n"
-            export_text += f"Posted: {draft.get('timestamp', 'N/A')}\n"
-            export_text += f"Description: {draft.get('description', 'N/A')}\n"
-            export_text += "-"*40 + "\n\n"
+            parts.append(
+                f"JOB #{i}\n"
+                f"ID: {draft.get('job_id', 'N/A')}\n"
+                f"Title: {draft.get('job_title', 'N/A')}\n"
+                f"Company: {draft.get('company', 'N/A')}\n"
+                f"Type: {draft.get('job_type', 'N/A')}\n"
+                f"Experience: {draft.get('experience', 'N/A')}\n"
+                f"Location: {draft.get('location', 'N/A')}\n"
+                f"Skills: {draft.get('skills', 'N/A')}\n"
+                f"Posted: {draft.get('timestamp', 'N/A')}\n"
+                f"Description: {draft.get('description', 'N/A')}\n"
+                f"{_SEP_40}\n\n"
+            )
         
-        return export_text
+        return "".join(parts)
     
     except Exception as e:
         logger.error(f"Error exporting user jobs: {e}")
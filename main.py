@@ -3,41 +3,209 @@
 Main entry point for the Slack ML Integration Bot
 """
 
+import atexit
 import os
 import sys
+import queue
 import signal
+import threading
 import logging
+import logging.handlers
 
 from config import Config
-from app import app, slack_handler, slack_connection_failed
 
 # Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG for more verbose output
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),  # Console output
-        logging.FileHandler('app.log')  # File output
-    ]
-)
-
-# Set specific loggers to appropriate levels
+# LOG_FORMAT doesn't use thread or process fields, so don't collect them for every record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+stream_handler = logging.StreamHandler()  # Console output
+stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+# DEBUG records reach the console only with DEBUG=true; app.log still gets everything LOG_LEVEL allows
+stream_handler.setLevel(logging.DEBUG if Config.DEBUG else logging.INFO)
+
+class BufferedFileHandler(logging.handlers.WatchedFileHandler):
+    """WatchedFileHandler that writes through a large file buffer, flushed every few seconds and on
+    errors instead of after every record. The logrotate check runs on each periodic flush rather
+    than stat()ing the file for every record"""
+
+    def __init__(self, filename, buffer_size=65536, flush_interval=5.0, **kwargs):
+        self.buffer_size = buffer_size
+        super().__init__(filename, **kwargs)
+        self._stop_flushing = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,),
+                                         name="log-flush", daemon=True)
+        self._flusher.start()
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def _flush_periodically(self, interval):
+        while not self._stop_flushing.wait(interval):
+            with self.lock:
+                self.flush()
+                self.reopenIfNeeded()
+
+    def emit(self, record):
+        # Same as FileHandler.emit, minus StreamHandler's flush after each record
+        # and WatchedFileHandler's per-record reopen check
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+                self._statstream()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self._stop_flushing.set()
+        super().close()
+
+
+# File output reaches disk at most every 5 seconds (immediately on ERROR and above),
+# so little is lost if the shutdown watchdog force-exits
+file_handler = BufferedFileHandler('app.log', encoding='utf-8')
+file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+# Request threads only enqueue records; a listener thread does the console and file writes.
+# The root logger gets the QueueHandler directly (not via basicConfig, which would give it
+# LOG_FORMAT and have every record formatted twice)
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+root_logger = logging.getLogger()
+root_logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO))  # LOG_LEVEL=DEBUG for verbose output
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener.start()
+_log_listener_running = True
+
+# Set specific loggers to appropriate levels. Logger levels are checked before a LogRecord
+# is created, so these drop noisy library records at no cost while keeping their warnings
 logging.getLogger('slack_bolt').setLevel(logging.INFO)
 logging.getLogger('slack_sdk').setLevel(logging.INFO)
 logging.getLogger('urllib3').setLevel(logging.WARNING)
 logging.getLogger('werkzeug').setLevel(logging.INFO)
+# Per-message tracing in the extractor only when debugging
+logging.getLogger('intent_entity_extractor').setLevel(logging.DEBUG if Config.DEBUG else logging.INFO)
 
 logger = logging.getLogger(__name__)
 
 
+def flush_logs():
+    """Drain the log queue and write out buffered records so nothing is lost on shutdown"""
+    global _log_listener_running
+    if _log_listener_running:
+        _log_listener_running = False
+        log_listener.stop()
+    file_handler.flush()
+
+
+atexit.register(flush_logs)
+
+
+# Upper bound on a graceful shutdown before the process is force-exited
+SHUTDOWN_TIMEOUT = int(os.getenv('SHUTDOWN_TIMEOUT_SECONDS', '30'))
+shutdown_event = threading.Event()
+stop_http_server = None  # set in main() once the HTTP server exists
+
+# Set in main(): importing app creates the Flask app and Slack handler, which pulls in
+# Flask, Slack Bolt and the ML stack, so it waits until the config has been validated
+app = None
+slack_handler = None
+slack_connection_failed = False
+
+
+def shutdown():
+    """Stop the HTTP server, close the Slack connection and flush logs (runs once)"""
+    if shutdown_event.is_set():
+        return
+    shutdown_event.set()
+    
+    # Force the exit if draining hangs
+    watchdog = threading.Timer(SHUTDOWN_TIMEOUT, lambda: os._exit(1))
+    watchdog.daemon = True
+    watchdog.start()
+    
+    try:
+        if stop_http_server:
+            stop_http_server()
+        if slack_handler:
+            slack_handler.shutdown()
+    except Exception as e:
+        logger.error(f"Error during shutdown: {e}")
+    finally:
+        flush_logs()
+        watchdog.cancel()
+
+
 def signal_handler(signum, frame):
+    if shutdown_event.is_set():
+        # Already shutting down: ignore this one, and let a further signal kill the process
+        logger.warning(f"Received signal {signum} during shutdown, ignoring it")
+        signal.signal(signum, signal.SIG_DFL)
+        return
     logger.info(f"Received signal {signum}, shutting down...")
-    if slack_handler:
-        slack_handler.shutdown()
+    shutdown()
     sys.exit(0)
 
 
+# Backup for exits that skip main()'s finally block
+atexit.register(shutdown)
+
+
+def create_wsgi_server():
+    """Build a WSGI server for the Flask app when uvicorn is unavailable.
+
+    Returns (serve_forever, stop) callables. waitress (bounded worker pool, pinned in
+    requirements.txt) is used; Werkzeug's threaded development server is only a fallback for
+    environments installed without it.
+    """
+    port = int(os.getenv('PORT', 3001))
+    try:
+        from waitress import create_server
+    except ImportError:
+        from werkzeug.serving import make_server
+        logger.warning("waitress not available, using Flask development server")
+        server = make_server('0.0.0.0', port, app, threaded=True)
+        return server.serve_forever, server.shutdown
+    
+    server = create_server(app, host='0.0.0.0', port=port, threads=int(os.getenv('WAITRESS_THREADS', '16')))
+    return server.run, server.close
+
+
+def create_uvicorn_server():
+    """Build a uvicorn server for the ASGI-wrapped Flask app, or None if uvicorn/asgiref are missing"""
+    try:
+        import uvicorn
+        from asgi import asgi_app
+    except ImportError as e:
+        logger.warning(f"uvicorn/asgiref not available ({e}), falling back to a WSGI server")
+        return None
+    
+    # loop='auto' / http='auto' pick uvloop and httptools when they are installed
+    # log_config=None keeps the logging setup configured above
+    config = uvicorn.Config(
+        asgi_app,
+        host='0.0.0.0',
+        port=int(os.getenv('PORT', 3001)),
+        loop='auto',
+        http='auto',
+        log_config=None,
+        timeout_graceful_shutdown=SHUTDOWN_TIMEOUT
+    )
+    return uvicorn.Server(config)
+
+
 def main():
+    global stop_http_server, app, slack_handler, slack_connection_failed
+    
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
@@ -47,32 +215,35 @@ def main():
         logger.error(f"Configuration error: {e}")
         sys.exit(1)
     
+    from app import app, slack_handler, slack_connection_failed
+    
     try:
-        # Start Flask server in background thread
-        from threading import Thread
-        flask_thread = Thread(
-            target=lambda: app.run(
-                host='0.0.0.0',
-                port=int(os.getenv('PORT', 3001)),
-                debug=False,  # Debug mode doesn't work well in threads
-                use_reloader=False,
-                threaded=True
-            ),
-            daemon=True
-        )
-        flask_thread.start()
-        logger.info("Flask server started in background thread...")
+        slack_available = slack_handler and not slack_connection_failed
+        server = create_uvicorn_server()
         
-        # Start Slack handler in main thread (required for Socket Mode)
-        if slack_handler and not slack_connection_failed:
-            logger.info("Starting Slack handler in main thread...")
-            slack_handler.run()  # This will block
+        if server:
+            # Slack Socket Mode connects on its own threads; the main thread runs the
+            # uvicorn event loop until it is asked to exit. uvicorn handles SIGINT/SIGTERM
+            # itself while running (draining in-flight requests), then re-raises them to us
+            stop_http_server = lambda: setattr(server, 'should_exit', True)
+            if slack_available:
+                logger.info("Connecting Slack handler...")
+                slack_handler.run(block=False)
+            else:
+                logger.warning("Slack handler not available, running Flask only...")
+            server.run()
         else:
-            logger.warning("Slack handler not available, running Flask only...")
-            # Keep main thread alive
-            import time
-            while True:
-                time.sleep(1)
+            # WSGI server in a background thread, stopped through stop_http_server
+            serve_forever, stop_http_server = create_wsgi_server()
+            threading.Thread(target=serve_forever, daemon=True).start()
+            logger.info("Flask server started in background thread...")
+            
+            if slack_available:
+                # Slack handler blocks the main thread
+                slack_handler.run()
+            else:
+                logger.warning("Slack handler not available, running Flask only...")
+                shutdown_event.wait()
         
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt, shutting down...")
@@ -80,9 +251,8 @@ def main():
         logger.error(f"Application startup failed: {e}")
         sys.exit(1)
     finally:
-        if slack_handler:
-            slack_handler.shutdown()
+        shutdown()
 
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
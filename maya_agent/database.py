@@ -5,6 +5,8 @@ import os
 import json
 import logging
 import uuid
+import queue
+from contextlib import closing, contextmanager
 from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
@@ -12,6 +14,70 @@ logger = logging.getLogger(__name__)
 # Database configuration
 DB_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'database', 'job_drafts.db'))
 
+# Settings that SQLite keeps per connection, applied by _connect() on every open
+_CONNECTION_PRAGMAS = (
+    'synchronous=NORMAL',
+    'temp_store=MEMORY',
+    'mmap_size=268435456',
+    'cache_size=-20000',
+    'busy_timeout=5000',
+)
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to the pool instead of closing it,
+    so existing `conn.close()` / `closing(...)` call sites reuse warm connections"""
+
+    def close(self):
+        _pool.release(self)
+
+class _Pool:
+    """Up to maxsize idle connections to DB_FILE, PRAGMAs already applied.
+
+    Connections return sqlite3.Row rows: readable by name and by index, and dict(row) builds a dict
+    without going through cursor.description in Python.
+    """
+
+    def __init__(self, maxsize=8):
+        self._idle = queue.Queue(maxsize=maxsize)
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(DB_FILE, factory=_PooledConnection, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(f'PRAGMA {pragma}')
+        conn.in_pool = False
+        return conn
+
+    def release(self, conn):
+        if getattr(conn, 'in_pool', False):
+            return  # already returned by an earlier close()
+        try:
+            # Discard anything the caller left uncommitted and undo per-call settings
+            conn.rollback()
+            conn.row_factory = sqlite3.Row
+            conn.in_pool = True
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            sqlite3.Connection.close(conn)
+
+_pool = _Pool()
+
+def _connect():
+    """Take a connection to DB_FILE from the pool; close() returns it"""
+    return _pool.acquire()
+
+@contextmanager
+def get_conn():
+    """Context manager form of _connect(): yields a pooled connection and returns it afterwards"""
+    conn = _connect()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
 def ensure_database_directory():
     """Ensure the database directory exists"""
     db_dir = os.path.dirname(DB_FILE)
@@ -23,7 +89,10 @@ def create_draft_table():
     """Create the drafts and edit_requests tables if they don't exist"""
     ensure_database_directory()
     
-    conn = sqlite3.connect(DB_FILE)
+    conn = _connect()
+    # WAL lets readers run alongside a writer and, with synchronous=NORMAL, commits without
+    # an fsync each; the journal mode is stored in the database file, so setting it once is enough
+    conn.execute('PRAGMA journal_mode=WAL')
     cursor = conn.cursor()
 
     # Create drafts table with enhanced schema
@@ -112,6 +181,7 @@ def create_draft_table():
 
     # Create indexes for better performance
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_user_id ON drafts(user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_user_job ON drafts(user_id, job_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_timestamp ON drafts(timestamp)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_status ON drafts(status)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_job_type ON drafts(job_type)")
@@ -129,7 +199,7 @@ def create_draft_table():
 def insert_draft(job_id, user_id, username, channel_id, job_data, description):
     """Insert a new job draft into the database with enhanced data"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
 
         # Extract additional fields from job_data if present
@@ -192,7 +262,7 @@ def get_latest_user_draft(user_id):
     including job_title, company, experience, location, and skills.
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -237,16 +307,15 @@ def get_latest_user_draft(user_id):
 def get_draft_by_job_id(job_id):
     """Fetch a single draft using its job_id"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
 
         cursor.execute("SELECT * FROM drafts WHERE job_id = ? AND status = 'active'", (job_id,))
         row = cursor.fetchone()
 
         if row:
-            # Convert row to dictionary using column names
-            columns = [desc[0] for desc in cursor.description]
-            result = dict(zip(columns, row))
+            # Rows come back as sqlite3.Row (see _Pool); dict() it so JSON fields can be replaced
+            result = dict(row)
             
             # Parse JSON fields
             if result.get('tags'):
@@ -269,9 +338,6 @@ def get_draft_by_job_id(job_id):
 def get_user_drafts(user_id, limit=10, include_deleted=False, filter_criteria=None):
     """Fetch user's job drafts from database with advanced filtering"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
         # Build query conditions
         conditions = ["user_id = ?"]
         params = [user_id]
@@ -303,22 +369,21 @@ def get_user_drafts(user_id, limit=10, include_deleted=False, filter_criteria=No
         params.append(limit)
         where_clause = " AND ".join(conditions)
         
-        cursor.execute(f"""
-            SELECT * FROM drafts 
-            WHERE {where_clause}
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, params)
-        
-        rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        
-        conn.close()
+        # get_conn() returns the connection to the pool even if the query raises
+        with get_conn() as conn:
+            cursor = conn.execute(f"""
+                SELECT * FROM drafts 
+                WHERE {where_clause}
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, params)
+            
+            rows = cursor.fetchall()
         
         # Convert to list of dictionaries with JSON parsing
         drafts = []
         for row in rows:
-            draft = dict(zip(columns, row))
+            draft = dict(row)
             
             # Parse JSON fields
             if draft.get('tags'):
@@ -343,7 +408,7 @@ def get_all_user_drafts(user_id):
 def update_draft(job_id, user_id, updated_data):
     """Update an existing draft with enhanced field support"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         # Build dynamic update query based on provided data
@@ -420,31 +485,28 @@ def update_draft(job_id, user_id, updated_data):
 def delete_user_draft(job_id, user_id, soft_delete=True):
     """Delete a specific user's draft (soft delete by default)"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        if soft_delete:
-            # Soft delete - mark as deleted
-            cursor.execute("""
-                UPDATE drafts 
-                SET status = 'deleted', updated_at = ?
-                WHERE job_id = ? AND user_id = ? AND status = 'active'
-            """, (datetime.utcnow().isoformat(), job_id, user_id))
-        else:
-            # Hard delete - actually remove from database
-            cursor.execute("""
-                DELETE FROM drafts 
-                WHERE job_id = ? AND user_id = ?
-            """, (job_id, user_id))
+        # get_conn() releases the connection; the inner `with conn` commits on
+        # success and rolls back if the statement raises
+        with get_conn() as conn, conn:
+            if soft_delete:
+                # Soft delete - mark as deleted
+                cursor = conn.execute("""
+                    UPDATE drafts 
+                    SET status = 'deleted', updated_at = ?
+                    WHERE job_id = ? AND user_id = ? AND status = 'active'
+                """, (datetime.utcnow().isoformat(), job_id, user_id))
+            else:
+                # Hard delete - actually remove from database
+                cursor = conn.execute("""
+                    DELETE FROM drafts 
+                    WHERE job_id = ? AND user_id = ?
+                """, (job_id, user_id))
         
         if cursor.rowcount > 0:
-            conn.commit()
-            conn.close()
             delete_type = "soft deleted" if soft_delete else "permanently deleted"
             print(f"✅ Draft {delete_type} successfully: {job_id}")
             return True
         else:
-            conn.close()
             print(f"❌ No draft found to delete: {job_id}")
             return False
             
@@ -456,7 +518,7 @@ def delete_user_draft(job_id, user_id, soft_delete=True):
 def restore_draft(job_id, user_id):
     """Restore a soft-deleted draft"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -483,7 +545,7 @@ def restore_draft(job_id, user_id):
 def archive_old_drafts(days_old=90):
     """Archive drafts older than specified days"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
@@ -510,7 +572,7 @@ def archive_old_drafts(days_old=90):
 def insert_edit_request(job_id, user_id, username, channel_id, job_data, description):
     """Insert an edit request into the database"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -542,7 +604,7 @@ def insert_edit_request(job_id, user_id, username, channel_id, job_data, descrip
 def get_edit_request(job_id):
     """Retrieve an edit request by job_id"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
 
         cursor.execute("SELECT * FROM edit_requests WHERE job_id = ?", (job_id,))
@@ -551,8 +613,7 @@ def get_edit_request(job_id):
         conn.close()
 
         if row:
-            columns = [desc[0] for desc in cursor.description]
-            result = dict(zip(columns, row))
+            result = dict(row)
             # Parse the JSON string back to dict
             try:
                 result['original_job_data'] = json.loads(result['original_job_data'])
@@ -570,25 +631,20 @@ def get_edit_request(job_id):
 def get_user_edit_requests(user_id, limit=5):
     """Fetch user's edit requests from database"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM edit_requests 
-            WHERE user_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, (user_id, limit))
-        
-        rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        
-        conn.close()
+        with get_conn() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM edit_requests 
+                WHERE user_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, (user_id, limit))
+            
+            rows = cursor.fetchall()
         
         # Convert to list of dictionaries
         edit_requests = []
         for row in rows:
-            edit_request = dict(zip(columns, row))
+            edit_request = dict(row)
             # Parse JSON data
             if edit_request.get('original_job_data'):
                 try:
@@ -607,7 +663,7 @@ def get_user_edit_requests(user_id, limit=5):
 def update_edit_status(job_id, status, error_message=None, edit_notes=None):
     """Update the status of an edit request with additional info"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
 
         update_fields = ["edit_status = ?", "timestamp = ?"]
@@ -651,7 +707,7 @@ def update_edit_status(job_id, status, error_message=None, edit_notes=None):
 def delete_edit_request(job_id):
     """Delete an edit request"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM edit_requests WHERE job_id = ?", (job_id,))
@@ -675,7 +731,7 @@ def delete_edit_request(job_id):
 def search_drafts_by_title(user_id, search_term, limit=10):
     """Search drafts by job title"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -687,10 +743,9 @@ def search_drafts_by_title(user_id, search_term, limit=10):
         """, (user_id, f"%{search_term}%", limit))
         
         rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
         conn.close()
         
-        return [dict(zip(columns, row)) for row in rows]
+        return [dict(row) for row in rows]
         
     except Exception as e:
         print(f"❌ Error searching drafts: {e}")
@@ -700,7 +755,7 @@ def search_drafts_by_title(user_id, search_term, limit=10):
 def search_drafts_advanced(user_id, search_criteria, limit=20):
     """Advanced search with multiple criteria"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         conditions = ["user_id = ?", "status = 'active'"]
@@ -740,10 +795,9 @@ def search_drafts_advanced(user_id, search_criteria, limit=20):
         """, params)
         
         rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
         conn.close()
         
-        return [dict(zip(columns, row)) for row in rows]
+        return [dict(row) for row in rows]
         
     except Exception as e:
         print(f"❌ Error in advanced search: {e}")
@@ -753,7 +807,7 @@ def search_drafts_advanced(user_id, search_criteria, limit=20):
 def get_drafts_by_date_range(user_id, start_date, end_date, limit=50):
     """Get drafts within a date range"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -765,10 +819,9 @@ def get_drafts_by_date_range(user_id, start_date, end_date, limit=50):
         """, (user_id, start_date, end_date, limit))
         
         rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
         conn.close()
         
-        return [dict(zip(columns, row)) for row in rows]
+        return [dict(row) for row in rows]
         
     except Exception as e:
         print(f"❌ Error getting drafts by date range: {e}")
@@ -779,7 +832,7 @@ def get_drafts_by_date_range(user_id, start_date, end_date, limit=50):
 def get_user_stats(user_id):
     """Get comprehensive statistics for a user"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         # Total drafts by status
@@ -863,7 +916,7 @@ def get_user_stats(user_id):
 def get_global_stats():
     """Get global database statistics"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         # Total jobs by status
@@ -917,7 +970,7 @@ def get_global_stats():
 def add_job_application(job_id, applicant_data):
     """Add a job application"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -956,7 +1009,7 @@ def add_job_application(job_id, applicant_data):
 def get_job_applications(job_id, limit=50):
     """Get applications for a specific job"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -967,10 +1020,9 @@ def get_job_applications(job_id, limit=50):
         """, (job_id, limit))
         
         rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
         conn.close()
         
-        return [dict(zip(columns, row)) for row in rows]
+        return [dict(row) for row in rows]
         
     except Exception as e:
         print(f"❌ Error getting applications: {e}")
@@ -980,7 +1032,7 @@ def get_job_applications(job_id, limit=50):
 def update_application_status(application_id, status, notes=None):
     """Update application status"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         update_fields = ["status = ?"]
@@ -1012,7 +1064,7 @@ def update_application_status(application_id, status, notes=None):
 def record_job_view(job_id, viewer_data):
     """Record a job view for analytics"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -1037,7 +1089,7 @@ def record_job_view(job_id, viewer_data):
 def get_job_analytics(job_id):
     """Get analytics for a specific job"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         # Total views
@@ -1080,7 +1132,7 @@ def get_job_analytics(job_id):
 def cleanup_old_edit_requests(days_old=30):
     """Clean up old completed edit requests"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
@@ -1105,7 +1157,7 @@ def cleanup_old_edit_requests(days_old=30):
 def cleanup_old_job_views(days_old=365):
     """Clean up old job view records"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
@@ -1130,7 +1182,7 @@ def cleanup_old_job_views(days_old=365):
 def get_database_stats():
     """Get overall database statistics"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         # Count of drafts by status
@@ -1183,7 +1235,7 @@ def get_database_stats():
 def optimize_database():
     """Optimize database performance"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         # Analyze tables for query optimization
@@ -1211,9 +1263,10 @@ def backup_database(backup_path=None):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = f"{DB_FILE}.backup_{timestamp}"
         
-        # Simple file copy backup
-        import shutil
-        shutil.copy2(DB_FILE, backup_path)
+        # SQLite online backup: in WAL mode recent commits may still live in the -wal file,
+        # which a plain copy of DB_FILE would miss
+        with get_conn() as source, closing(sqlite3.connect(backup_path)) as target:
+            source.backup(target)
         
         print(f"✅ Database backed up to: {backup_path}")
         return backup_path
@@ -1446,7 +1499,7 @@ def test_all_functions():
 def get_performance_metrics():
     """Get database performance metrics"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = _connect()
         cursor = conn.cursor()
         
         # Get table sizes
@@ -34,18 +34,26 @@ PERSON_URN = os.getenv("PERSON_URN")
 
 OLLAMA_URL = os.getenv("OLLAMA_URL")
 
+# Pooled HTTP sessions so repeated Slack/LinkedIn calls reuse TCP+TLS connections
+_slack_session = requests.Session()
+_slack_session.headers.update({
+    "Authorization": f"Bearer {SLACK_BOT}",
+    "Content-Type": "application/json; charset=utf-8"
+})
+_linkedin_session = requests.Session()
+_linkedin_session.headers.update({
+    "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
+    "Content-Type": "application/json",
+    "X-Restli-Protocol-Version": "2.0.0"
+})
+
 def send_slack_message(channel_id, text):#Add Channel_id as a paramater
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT}",
-        "Content-Type": "application/json; charset=utf-8"
-    }
-    
     data = {
         "channel": channel_id,
         "text": text,
     }
     print(channel_id)
-    response = requests.post("https://slack.com/api/chat.postMessage", json=data, headers=headers)#Add username and user_id
+    response = _slack_session.post("https://slack.com/api/chat.postMessage", json=data)#Add username and user_id
  
     return response.json()
 
@@ -168,7 +176,7 @@ def job_description_llm(state: AgentState) -> AgentState:#add Channel id as a pa
 
         state["job_data"]["llm_description"] = description
         # 🔁 Slack interactive part
-        job_id = str(uuid.uuid4())[:8]
+        job_id = uuid.uuid4().hex[:8]
 
         # Save the job as a draft first
         insert_draft(
@@ -232,12 +240,6 @@ def post_job_to_linkedin(state: AgentState) -> AgentState:
         "#Hiring #JobOpening #Careers"
     )
 
-    headers = {
-        "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-        "X-Restli-Protocol-Version": "2.0.0"
-    }
-
     payload = {
         "author": PERSON_URN,
         "lifecycleState": "PUBLISHED",
@@ -253,7 +255,7 @@ def post_job_to_linkedin(state: AgentState) -> AgentState:
     }
 
     try:
-        res = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=payload)
+        res = _linkedin_session.post("https://api.linkedin.com/v2/ugcPosts", json=payload)
 
         if res.status_code == 201:
             post_id = res.headers.get("x-restli-id", "unknown")
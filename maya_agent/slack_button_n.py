@@ -14,6 +14,7 @@ from dotenv import load_dotenv
 # Import database functions and other necessary logic
 from maya_agent.database import get_draft_by_job_id, delete_user_draft, update_draft
 from edit_rag.edit_formatter import run_job_rewrite_pipeline
+from edit_state_manager import set_user_edit_mode
 
 
 # Step 1: go up one directory level from this script's location
@@ -79,24 +80,14 @@ def handle_button_click(ack, body, client, action):
         delete_user_draft(job_id, user_id) # Clean up the draft
     elif clicked_action == "edit_click":
         # The user wants to edit. We'll set the edit mode state.
-        edit_mode_path = os.path.join(os.path.dirname(__file__), '..', 'edit_mode.json')
-        try:
-            with open(edit_mode_path, 'r') as f:
-                edit_mode = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            edit_mode = {}
-        
-        edit_mode[user_id] = {
-            "status": True,
-            "message": job_data.get("description", ""),
-            "job_id": job_id,
-            "channel_id": channel_id,
-            "user_name": user_name,
-            "job_data": job_data
-        }
-        
-        with open(edit_mode_path, 'w') as f:
-            json.dump(edit_mode, f)
+        set_user_edit_mode(
+            user_id,
+            job_data.get("description", ""),
+            job_id=job_id,
+            channel_id=channel_id,
+            user_name=user_name,
+            job_data=job_data
+        )
             
         result_text = f"✏ Got it <@{user_id}>, I've marked this for editing. Please provide the necessary changes."
         
@@ -126,9 +117,8 @@ def _update_slack_message(client, body, result_text):
 
 
 # ====== Send Job Description to Slack ======
-def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
-    client = app.client
-
+def _job_desc_message(JOB_DESC, job_id, user_name, user_id):
+    """Text + blocks for a job description with the approve/reject/edit/draft buttons"""
     # 👉 Encode user info into block_id as JSON
     block_metadata = json.dumps({
         "job_id": job_id, 
@@ -136,11 +126,9 @@ def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
         "user_id": user_id
     })
 
-    print(f"📤 Posting to Slack | job_id: {job_id}")
-    client.chat_postMessage(
-        channel=CHANNEL_ID,
-        text="Choose an action:",
-        blocks=[
+    return {
+        "text": "Choose an action:",
+        "blocks": [
             {
                 "type": "section",
                 "text": {"type": "mrkdwn", "text": f"Hey @{user_name}, here's your job description:\n\n{JOB_DESC}\n\nWhat would you like to do?"}
@@ -156,6 +144,26 @@ def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
                 ]
             }
         ]
+    }
+
+
+def update_job_desc(CHANNEL_ID, message_ts, JOB_DESC, job_id, user_name, user_id):
+    """Turn an already-posted message (e.g. a streamed draft) into the job description with buttons"""
+    print(f"📤 Finalizing Slack message {message_ts} | job_id: {job_id}")
+    app.client.chat_update(
+        channel=CHANNEL_ID,
+        ts=message_ts,
+        **_job_desc_message(JOB_DESC, job_id, user_name, user_id)
+    )
+
+
+def send_job_desc(CHANNEL_ID, JOB_DESC, job_id, user_name, user_id):
+    client = app.client
+
+    print(f"📤 Posting to Slack | job_id: {job_id}")
+    client.chat_postMessage(
+        channel=CHANNEL_ID,
+        **_job_desc_message(JOB_DESC, job_id, user_name, user_id)
     )
 
     # NO MORE WAITING! The function returns immediately.
@@ -1,6 +1,6 @@
 import logging
-from typing import Dict, Any, List
-from edit_state_manager import is_user_in_edit_mode, get_user_original_message
+from typing import Dict, Any, List, Optional
+from edit_state_manager import is_user_in_edit_mode, get_user_original_message, get_edit_context
 from edit_rag_processor import edit_rag, validate_edit_instructions
 
 logger = logging.getLogger(__name__)
@@ -24,10 +24,12 @@ def route_user_message(user_id: str, username: str, channel_id: str,
     try:
         logger.info(f"Routing message for user {user_id}")
         
-        # Check if user is in edit mode
-        if is_user_in_edit_mode(user_id):
+        # Check if user is in edit mode (status and original message in one lookup)
+        edit_context = get_edit_context(user_id)
+        if edit_context:
             logger.info(f"User {user_id} is in edit mode, routing to edit_rag")
-            return route_to_edit_rag(user_id, username, channel_id, user_messages, slack_handler)
+            return route_to_edit_rag(user_id, username, channel_id, user_messages, slack_handler,
+                                     original_message=edit_context[1])
         else:
             logger.info(f"User {user_id} is in normal mode, routing to rag")
             return route_to_normal_rag(user_id, username, channel_id, user_messages, slack_handler)
@@ -42,7 +44,8 @@ def route_user_message(user_id: str, username: str, channel_id: str,
 
 
 def route_to_edit_rag(user_id: str, username: str, channel_id: str, 
-                     user_messages: List[str], slack_handler=None) -> Dict[str, Any]:
+                     user_messages: List[str], slack_handler=None,
+                     original_message: Optional[str] = None) -> Dict[str, Any]:
     """
     Route message to edit_rag pipeline.
     
@@ -52,13 +55,15 @@ def route_to_edit_rag(user_id: str, username: str, channel_id: str,
         channel_id: Slack channel ID
         user_messages: List of edit instructions
         slack_handler: Slack handler instance
+        original_message: Original message from edit state, looked up if not given
         
     Returns:
         Dictionary with edit processing result
     """
     try:
         # Get original message from edit state
-        original_message = get_user_original_message(user_id)
+        if original_message is None:
+            original_message = get_user_original_message(user_id)
         if not original_message:
             logger.error(f"No original message found for user {user_id} in edit mode")
             return {
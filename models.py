@@ -7,7 +7,7 @@ class MLProcessorError(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class SlackMessage:
     user_id: str
     username: str
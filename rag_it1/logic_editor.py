@@ -2,13 +2,14 @@ import json
 import os
 import uuid
 from typing import Dict, List, Any
+from edit_state_manager import get_user_edit_status, setdefault_user_edit_state, update_user_edit_state
 # from redis_manager import RedisManager # No longer needed
 
 class RoundRobinQueueManager:
     def __init__(self):
         # self.redis = RedisManager() # No longer needed
         self.user_queue_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'user_queue.json'))
-        self.edit_mode_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'edit_mode.json'))
+        # edit_mode.json is read and written through edit_state_manager
         
     def _read_json_file(self, file_path: str) -> Dict:
         try:
@@ -52,12 +53,9 @@ class RoundRobinQueueManager:
                 continue
             
             # Mark user as free if not set
-            edit_mode = self._read_json_file(self.edit_mode_file)
-            user_edit_status = edit_mode.get(user_id, {})
+            user_edit_status = get_user_edit_status(user_id) or {}
             if "free" not in user_edit_status:
-                user_edit_status["free"] = True
-                edit_mode[user_id] = user_edit_status
-                self._write_json_file(self.edit_mode_file, edit_mode)
+                setdefault_user_edit_state(user_id, {"free": True})
             elif user_edit_status.get("free") == False:
                 continue
 
@@ -87,24 +85,15 @@ class RoundRobinQueueManager:
         return None
 
     def mark_user_busy(self, user_id: str) -> None:
-        edit_mode = self._read_json_file(self.edit_mode_file)
-        user_status = edit_mode.get(user_id, {})
-        user_status["free"] = False
-        edit_mode[user_id] = user_status
-        self._write_json_file(self.edit_mode_file, edit_mode)
+        update_user_edit_state(user_id, {"free": False})
 
     def mark_user_free(self, user_id: str) -> None:
-        edit_mode = self._read_json_file(self.edit_mode_file)
-        user_status = edit_mode.get(user_id, {})
-        user_status["free"] = True
-        edit_mode[user_id] = user_status
-        self._write_json_file(self.edit_mode_file, edit_mode)
+        update_user_edit_state(user_id, {"free": True})
 
     def get_user_queue_status(self, user_id: str) -> Dict:
         user_queues = self._read_json_file(self.user_queue_file)
         queue = user_queues.get(user_id, [])
-        edit_mode = self._read_json_file(self.edit_mode_file)
-        user_status = edit_mode.get(user_id, {})
+        user_status = get_user_edit_status(user_id) or {}
         return {
             "user_id": user_id,
             "pending_requests": queue,
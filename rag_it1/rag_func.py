@@ -32,6 +32,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from .retrieval.vectorstore import get_vectorstore
 from intent_entity_extractor.extractor import intent_entity_processor
 from edit_rag.edit_formatter import run_job_rewrite_pipeline
+from edit_state_manager import clear_user_edit_mode, get_user_edit_status, setdefault_user_edit_state
 from .format_llm_1 import extract_jobs_from_input
 # Shared LLM for formatting
 
@@ -252,15 +253,8 @@ def process_messages(json_data: dict, slack_handler=None) -> list:
     for user_id, message_list in user_messages.items():
         user_reply = " ".join(message_list)
         
-        # Check if user is in edit mode using JSON file
-        edit_mode_path = os.path.join(os.path.dirname(__file__), '..', 'edit_mode.json')
-        try:
-            with open(edit_mode_path, 'r') as f:
-                edit_mode_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            edit_mode_data = {}
-
-        edit_mode = edit_mode_data.get(user_id, {})
+        # Check if user is in edit mode (edit_mode.json, via edit_state_manager)
+        edit_mode = get_user_edit_status(user_id) or {}
         if edit_mode.get("status") == True:
             # Call pipeline to edit the job description
             job_desc = edit_mode.get("message")
@@ -273,10 +267,7 @@ def process_messages(json_data: dict, slack_handler=None) -> list:
             run_job_rewrite_pipeline(user_id=user_id, reply=user_reply, job_desc=job_desc, user_name=user_name, channel_id=channel_id)
             
             # Clear edit mode after processing
-            edit_mode["status"] = False
-            edit_mode_data[user_id] = edit_mode
-            with open(edit_mode_path, 'w') as f:
-                json.dump(edit_mode_data, f)
+            clear_user_edit_mode(user_id)
             
             print(f"✅ Edit mode cleared for user {user_id}")
             continue
@@ -284,9 +275,7 @@ def process_messages(json_data: dict, slack_handler=None) -> list:
             # Initialize edit mode if not exists
             if not edit_mode:
                 edit_mode = {"status": False, "free": True, "message": ""}
-                edit_mode_data[user_id] = edit_mode
-                with open(edit_mode_path, 'w') as f:
-                    json.dump(edit_mode_data, f)
+                setdefault_user_edit_state(user_id, edit_mode)
            
             extracted = extract_jobs_from_input(user_reply)
             if isinstance(extracted, dict):
@@ -29,6 +29,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from .retrieval.vectorstore import get_vectorstore
 from intent_entity_extractor.extractor import intent_entity_processor
 from edit_rag.edit_formatter import run_job_rewrite_pipeline
+from edit_state_manager import clear_user_edit_mode, get_user_edit_status, setdefault_user_edit_state
 from .format_llm_1 import extract_jobs_from_input
 # Shared LLM for formatting
 formatter_llm = ChatNVIDIA(
@@ -279,19 +280,14 @@ def process_messages(json_data: dict, slack_handler=None) -> list:
                 "channel_id": msg.get("channel_id", ""),
                 "session_id": msg.get("session_id", "")
             }
-    # Check edit mode before processing
-    try:
-        with open("edit_mode.json","r") as f:
-            edit_dict = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        edit_dict = {}
-    
     for user_id, message_list in user_messages.items():
         #add formetter llm code to process use message list
         user_reply = " ".join(message_list)
-        if user_id in edit_dict and edit_dict[user_id].get("status") == True:
+        # Check edit mode before processing (edit_mode.json, via edit_state_manager)
+        user_edit_state = get_user_edit_status(user_id)
+        if user_edit_state is not None and user_edit_state.get("status") == True:
             # Call pipeline to edit the job description
-            job_desc = edit_dict[user_id]["message"]
+            job_desc = user_edit_state["message"]
             user_name = user_meta[user_id]["username"]
             channel_id = user_meta[user_id]["channel_id"]
             
@@ -304,20 +300,14 @@ def process_messages(json_data: dict, slack_handler=None) -> list:
             run_job_rewrite_pipeline(user_id=user_id, reply=user_reply, job_desc=job_desc, user_name=user_name,channel_id=channel_id)
             
             # Clear edit mode after processing
-            edit_dict[user_id]["status"] = False
-            with open("edit_mode.json","w") as f:
-                json.dump(edit_dict, f, indent=2)
+            clear_user_edit_mode(user_id)
             
             print(f"✅ Edit mode cleared for user {user_id}")
             continue
         else:
-            if user_id not in edit_dict:
-               edit_dict[user_id]={}
-               edit_dict[user_id]["status"]=False
-               edit_dict[user_id]["free"]=True
-               edit_dict[user_id]["message"]=None
-               with open("edit_mode.json","w") as f:
-                json.dump(edit_dict, f, indent=2)
+            if user_edit_state is None:
+               user_edit_state = {"status": False, "free": True, "message": None}
+               setdefault_user_edit_state(user_id, user_edit_state)
            
             extracted=extract_jobs_from_input(user_reply)
             if(isinstance(extracted,dict)):
@@ -329,9 +319,9 @@ def process_messages(json_data: dict, slack_handler=None) -> list:
                 tracker_dict={user_id:message_list}
                 current_processor=tracker.process_user_requests(tracker_dict)
                 print(current_processor)
-                if edit_dict[user_id].get("free")==False:
+                if user_edit_state.get("free")==False:
                   continue
-                elif edit_dict[user_id].get("free")==True:
+                elif user_edit_state.get("free")==True:
                   tracker.mark_user_busy(user_id)
         try:
             # Check if this is a specific job action - if so, bypass formatter LLM
@@ -1,7 +1,7 @@
 import json
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
@@ -340,8 +340,8 @@ class SlackHandler:
         except Exception as e:
             logger.error(f"Error posting response to Slack: {e}")
 
-    def run(self):
-        """Start the Slack bot using Socket Mode"""
+    def run(self, block: bool = True):
+        """Start the Slack bot using Socket Mode; with block=False, connect and return immediately"""
         try:
             # Start background systems
             self.ml_processor.start()
@@ -352,7 +352,11 @@ class SlackHandler:
             print("="*80)
             logger.info("Starting Slack bot with Socket Mode...")
             
-            self.socket_handler.start()
+            if block:
+                self.socket_handler.start()
+            else:
+                # The socket client runs on its own threads, leaving this one free for the HTTP server
+                self.socket_handler.connect()
         except Exception as e:
             logger.error(f"Failed to start Slack bot: {e}")
             self.shutdown()
@@ -380,10 +384,12 @@ class SlackHandler:
             
         logger.info("Slack bot shutdown complete")
 
-    def get_final_outcomes_json(self, channel_id: str, thread_ts: Optional[str] = None) -> str:
+    def get_final_outcomes(self, channel_id: str, thread_ts: Optional[str] = None) -> List[Dict[str, Any]]:
         messages = self.message_store.get_messages(channel_id, thread_ts)
-        outcomes = [msg.to_final_outcome_dict() for msg in messages]
-        return json.dumps(outcomes, indent=2)
+        return [msg.to_final_outcome_dict() for msg in messages]
+
+    def get_final_outcomes_json(self, channel_id: str, thread_ts: Optional[str] = None) -> str:
+        return json.dumps(self.get_final_outcomes(channel_id, thread_ts), indent=2)
 
     def get_stats(self) -> Dict[str, Any]:
         try: